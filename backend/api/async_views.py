@@ -0,0 +1,90 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from tempfile import SpooledTemporaryFile
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import FileResponse, HttpResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from api.db import check_connections
+
+READ_ROUTES = (
+    'recipes-list',
+    'recipes-detail',
+    'recipes-download-shopping-cart',
+    'tags-list',
+    'tags-detail',
+    'ingredient-list',
+)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_READ_WORKERS,
+    thread_name_prefix='api-read'
+)
+
+
+def spool_response(response):
+    file = SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    try:
+        for chunk in response.streaming_content:
+            file.write(chunk)
+    except Exception:
+        file.close()
+        raise
+    finally:
+        response.close()
+    size = file.tell()
+    file.seek(0)
+    spooled = FileResponse(
+        file, status=response.status_code, headers=response.headers
+    )
+    spooled['Content-Length'] = size
+    return spooled
+
+
+def render_view(view, request, *args, **kwargs):
+    close_old_connections()
+    check_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if response.streaming:
+            return spool_response(response)
+        if hasattr(response, 'render'):
+            response.render()
+        return HttpResponse(
+            response.content,
+            status=response.status_code,
+            headers=response.headers
+        )
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await sync_to_async(view, thread_sensitive=True)(
+                request, *args, **kwargs
+            )
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            partial(context.run, render_view, view, request, *args, **kwargs)
+        )
+
+    return async_view
+
+
+def wrap_read_routes(urls):
+    if not settings.ASYNC_READ_VIEWS:
+        return urls
+    for pattern in urls:
+        if pattern.name in READ_ROUTES:
+            pattern.callback = async_read_view(pattern.callback)
+    return urls
@@ -0,0 +1,104 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.models import User
+
+SHARED_KEY = 'auth_token:{}'
+
+
+class TokenCache:
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, user)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+token_cache = TokenCache(
+    settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TIMEOUT
+)
+
+
+def get_shared_key(key):
+    return SHARED_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def invalidate_tokens(*keys):
+    token_cache.delete(*keys)
+    if settings.AUTH_TOKEN_SHARED_CACHE:
+        cache.delete_many([get_shared_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is None and settings.AUTH_TOKEN_SHARED_CACHE:
+            user = cache.get(get_shared_key(key))
+            if user is not None:
+                token_cache.set(key, user)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user)
+            if settings.AUTH_TOKEN_SHARED_CACHE:
+                cache.set(
+                    get_shared_key(key), user,
+                    settings.AUTH_TOKEN_CACHE_TIMEOUT
+                )
+            return copy.copy(user), token
+        if not user.is_active:
+            raise AuthenticationFailed('Пользователь неактивен или удален.')
+        user = copy.copy(user)
+        return user, Token(key=key, user=user)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: invalidate_tokens(key))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    keys = list(
+        Token.objects.filter(user=instance).values_list('key', flat=True)
+    )
+    if keys:
+        transaction.on_commit(lambda: invalidate_tokens(*keys))
@@ -0,0 +1,173 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from api.metrics import CACHE_REQUESTS
+from recipes.models import (FavoriteRecipe, Ingredient, Recipe,
+                            ShoppingCart, Tag)
+from users.models import Subscribe, User
+
+VERSION_KEY = 'api_cache:version:{}'
+RESPONSE_KEY = 'api_cache:response:{}'
+
+
+def get_versions(*groups):
+    keys = [VERSION_KEY.format(group) for group in groups]
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_version(*groups):
+    now = time.time()
+    cache.set_many(
+        {VERSION_KEY.format(group): now for group in groups}, None
+    )
+
+
+def bump_version_on_commit(*groups):
+    transaction.on_commit(lambda: bump_version(*groups))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_version_on_commit('tags')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_version_on_commit('ingredients')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_changed(sender, **kwargs):
+    bump_version_on_commit('recipes')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, **kwargs):
+    bump_version_on_commit('users')
+
+
+@receiver(post_save, sender=FavoriteRecipe)
+@receiver(post_delete, sender=FavoriteRecipe)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_save, sender=Subscribe)
+@receiver(post_delete, sender=Subscribe)
+def user_relation_changed(sender, instance, **kwargs):
+    bump_version_on_commit(f'user:{instance.user_id}')
+
+
+def get_validators(request, groups, user=None):
+    if user is not None and user.is_authenticated:
+        groups = (*groups, f'user:{user.id}')
+        user_id = str(user.id)
+    else:
+        user_id = ''
+    versions = get_versions(*groups)
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+    ))
+    raw = '|'.join([
+        request.path,
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        user_id,
+        *map(repr, versions)
+    ])
+    etag = '"{}"'.format(hashlib.md5(raw.encode()).hexdigest())
+    return etag, int(max(versions))
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    cache_groups = ()
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = get_validators(
+            request, self.cache_groups, request.user
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            CACHE_REQUESTS.labels('response', 'miss').inc()
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        else:
+            CACHE_REQUESTS.labels('response', 'not_modified').inc()
+        return set_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class AnonymousCacheMixin(ConditionalGetMixin):
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method != 'GET'
+            or 'HTTP_AUTHORIZATION' in request.META
+            or not self.cache_groups
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = get_validators(request, self.cache_groups)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            CACHE_REQUESTS.labels('response', 'not_modified').inc()
+            return set_validators(response, etag, last_modified)
+        key = RESPONSE_KEY.format(etag.strip('"'))
+        cached = cache.get(key)
+        if cached is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            response.render()
+            cache.set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'vary': response.get('Vary'),
+            }, settings.API_CACHE_TIMEOUT)
+            return response
+        CACHE_REQUESTS.labels('response', 'hit').inc()
+        response = HttpResponse(
+            cached['content'], content_type=cached['content_type']
+        )
+        if cached['vary']:
+            response['Vary'] = cached['vary']
+        return set_validators(response, etag, last_modified)
@@ -0,0 +1,80 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+
+from api.cache import get_versions
+
+PIN_KEY = 'db_primary:user:{}'
+
+read_database = ContextVar('read_database', default=None)
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    for connection in connections.all():
+        if (
+            connection.connection is None
+            or not connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            or connection.in_atomic_block
+        ):
+            continue
+        if not connection.is_usable():
+            connection.close()
+
+
+def get_last_write(user, groups):
+    writes = get_versions(*groups) if groups else []
+    if user.is_authenticated:
+        writes.append(cache.get(PIN_KEY.format(user.id), 0))
+    return max(writes, default=0)
+
+
+def pin_to_primary(user):
+    cache.set(
+        PIN_KEY.format(user.id), time.time(),
+        settings.DB_REPLICA_STICKY_SECONDS
+    )
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    cache_groups = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_database.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_database.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method not in SAFE_METHODS
+        ):
+            return
+        last_write = get_last_write(request.user, self.cache_groups)
+        if time.time() - last_write >= settings.DB_REPLICA_STICKY_SECONDS:
+            read_database.set(random.choice(settings.DATABASE_REPLICAS))
@@ -0,0 +1,100 @@
+import csv
+import io
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+from reportlab.pdfgen import canvas
+
+TITLE = 'Список покупок:'
+EMPTY = 'Cписок покупок отсутствует!'
+CHUNK_SIZE = 64 * 1024
+PDF_FONT = 'DejaVuSans'
+PDF_FONT_SIZE = 12
+PDF_MARGIN = 50
+
+
+def format_item(index, item):
+    return (
+        f'{index}. {item["recipe__ingredients__name"]} '
+        f'{item["amount"]} '
+        f'({item["recipe__ingredients__measurement_unit"]})'
+    )
+
+
+def export_txt(items):
+    empty = True
+    for index, item in enumerate(items, start=1):
+        if empty:
+            yield f'{TITLE} \n\n'
+            empty = False
+        yield format_item(index, item) + '\n'
+    if empty:
+        yield EMPTY
+
+
+def export_csv(items):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(('Ингредиент', 'Количество', 'Единица измерения'))
+    for item in items:
+        writer.writerow((
+            item['recipe__ingredients__name'],
+            item['amount'],
+            item['recipe__ingredients__measurement_unit']
+        ))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def get_pdf_font():
+    if PDF_FONT in pdfmetrics.getRegisteredFontNames():
+        return PDF_FONT
+    try:
+        pdfmetrics.registerFont(TTFont(PDF_FONT, settings.PDF_FONT_PATH))
+    except TTFError:
+        return 'Helvetica'
+    return PDF_FONT
+
+
+def export_pdf(items):
+    # Таблица ссылок PDF пишется в конце документа, поэтому файл собирается
+    # в SpooledTemporaryFile: большие списки сбрасываются на диск.
+    with SpooledTemporaryFile(max_size=CHUNK_SIZE) as file:
+        font = get_pdf_font()
+        pdf = canvas.Canvas(file, pagesize=A4)
+        width, height = A4
+        top = height - PDF_MARGIN
+        pdf.setFont(font, PDF_FONT_SIZE + 4)
+        pdf.drawString(PDF_MARGIN, top, TITLE)
+        y = top - PDF_FONT_SIZE * 3
+        pdf.setFont(font, PDF_FONT_SIZE)
+        empty = True
+        for index, item in enumerate(items, start=1):
+            empty = False
+            if y < PDF_MARGIN:
+                pdf.showPage()
+                pdf.setFont(font, PDF_FONT_SIZE)
+                y = top
+            pdf.drawString(PDF_MARGIN, y, format_item(index, item))
+            y -= PDF_FONT_SIZE * 1.5
+        if empty:
+            pdf.drawString(PDF_MARGIN, y, EMPTY)
+        pdf.save()
+        file.seek(0)
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+EXPORTERS = {
+    'txt': (export_txt, 'text/plain; charset=utf-8'),
+    'csv': (export_csv, 'text/csv; charset=utf-8'),
+    'pdf': (export_pdf, 'application/pdf'),
+}
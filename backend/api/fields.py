@@ -0,0 +1,107 @@
+import binascii
+import re
+import struct
+import uuid
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+from recipes.images import UPLOAD_FORMATS, strip_metadata
+
+BASE64_MARKER = ';base64,'
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r'\s')
+
+
+class Base64ImageField(serializers.ImageField):
+    default_error_messages = {
+        'invalid_base64': 'Изображение должно быть передано в base64.',
+        'too_large': 'Размер изображения больше {max_bytes} байт.',
+        'too_many_pixels': 'Изображение больше {max_side}px по стороне '
+                           'или {max_pixels} пикселей.',
+        'invalid_image': 'Загрузите корректное изображение.',
+        'invalid_format': 'Допустимые форматы изображений: {formats}.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) and data.startswith('http'):
+            raise SkipField()
+        if not isinstance(data, str) or BASE64_MARKER not in data:
+            self.fail('invalid_base64')
+        offset = data.index(BASE64_MARKER) + len(BASE64_MARKER)
+        if (len(data) - offset) // 4 * 3 > settings.RECIPE_IMAGE_MAX_BYTES:
+            self.fail('too_large', max_bytes=settings.RECIPE_IMAGE_MAX_BYTES)
+        if WHITESPACE.search(data, offset):
+            data, offset = WHITESPACE.sub('', data[offset:]), 0
+        file = SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        try:
+            self.decode_to_file(data, offset, file)
+            image_format = self.check_image(file, full=True)
+            if image_format not in UPLOAD_FORMATS:
+                self.fail('invalid_format', formats=', '.join(UPLOAD_FORMATS))
+            file = self.strip_metadata(file, image_format)
+        except Exception:
+            file.close()
+            raise
+        size = file.tell()
+        file.seek(0)
+        image = File(file, name=f'{uuid.uuid4()}.{image_format.lower()}')
+        image.size = size
+        return image
+
+    def strip_metadata(self, file, image_format):
+        try:
+            stripped = strip_metadata(file, image_format)
+        except (ValueError, struct.error, OSError):
+            self.fail('invalid_image')
+        file.close()
+        return stripped
+
+    def decode_to_file(self, data, offset, file):
+        for start in range(offset, len(data), CHUNK_SIZE):
+            try:
+                file.write(binascii.a2b_base64(
+                    data[start:start + CHUNK_SIZE]
+                ))
+            except (binascii.Error, ValueError):
+                self.fail('invalid_base64')
+            if start == offset:
+                file.flush()
+                self.check_image(file)
+
+    def check_image(self, file, full=False):
+        position = file.tell()
+        file.seek(0)
+        try:
+            image = Image.open(file)
+            width, height = image.size
+            if (
+                max(width, height) > settings.RECIPE_IMAGE_MAX_SIDE
+                or width * height > settings.RECIPE_IMAGE_MAX_PIXELS
+            ):
+                self.fail(
+                    'too_many_pixels',
+                    max_side=settings.RECIPE_IMAGE_MAX_SIDE,
+                    max_pixels=settings.RECIPE_IMAGE_MAX_PIXELS
+                )
+            if full:
+                image.verify()
+            return image.format
+        except Image.DecompressionBombError:
+            self.fail(
+                'too_many_pixels',
+                max_side=settings.RECIPE_IMAGE_MAX_SIDE,
+                max_pixels=settings.RECIPE_IMAGE_MAX_PIXELS
+            )
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            if full:
+                self.fail('invalid_image')
+            return None
+        finally:
+            file.seek(position)
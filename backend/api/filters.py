@@ -2,6 +2,7 @@ import django_filters as filters
 
 from users.models import User
 from recipes.models import Ingredient, Recipe
+from recipes.search import search_filter, search_rank
 
 
 class IngredientFilter(filters.FilterSet):
@@ -30,17 +31,30 @@ class RecipeFilter(filters.FilterSet):
         field_name='tags__slug',
         label='Ссылка'
     )
+    search = filters.CharFilter(
+        method='get_search',
+        label='Поиск'
+    )
 
     def get_is_in_shopping_cart(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
-            return queryset.filter(shopping_cart__user=self.request.user)
+            return queryset.filter(is_in_shopping_cart=True)
         return queryset
 
     def get_is_favorited(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
-            return queryset.filter(favorite_recipe__user=self.request.user)
+            return queryset.filter(is_favorited=True)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return queryset.filter(search_filter(value)).annotate(
+            search_rank=search_rank(value)
+        ).order_by('-search_rank', '-pub_date')
+
     class Meta:
         model = Recipe
-        fields = ["is_favorited", "is_in_shopping_cart", "author", "tags"]
+        fields = [
+            "is_favorited", "is_in_shopping_cart", "author", "tags", "search"
+        ]
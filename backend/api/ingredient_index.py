@@ -0,0 +1,52 @@
+import threading
+from bisect import bisect_left
+
+from api.cache import get_versions
+from recipes.models import Ingredient
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.data = ([], [])
+
+    def load(self, version):
+        rows = sorted(
+            Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            ).order_by().iterator(),
+            key=lambda row: (row[1].casefold(), row[0])
+        )
+        self.data = ([name.casefold() for _, name, _ in rows], rows)
+        self.version = version
+
+    def ensure_loaded(self):
+        version, = get_versions('ingredients')
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.load(version)
+
+    def search(self, query='', limit=None):
+        self.ensure_loaded()
+        query = query.casefold()
+        keys, items = self.data
+        start = bisect_left(keys, query)
+        end = start
+        while end < len(keys) and keys[end].startswith(query):
+            end += 1
+        found = items[start:end]
+        if query and (limit is None or len(found) < limit):
+            found.extend(
+                item for key, item in zip(keys, items)
+                if query in key and not key.startswith(query)
+            )
+        return [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for pk, name, measurement_unit in found[:limit]
+        ]
+
+
+ingredient_index = IngredientIndex()
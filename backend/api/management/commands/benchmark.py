@@ -0,0 +1,346 @@
+import base64
+import json
+import math
+import platform
+import time
+from collections import Counter
+from io import BytesIO
+
+import django
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.throttling import reset_auth_throttles
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def make_image():
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), (226, 108, 45)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+class Command(BaseCommand):
+    help = 'Замер задержки, числа запросов к БД и пропускной способности API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--user', help='Email пользователя для замеров')
+        parser.add_argument('--password', default='benchmark-password')
+        parser.add_argument(
+            '--only', nargs='+', metavar='NAME',
+            help='Запустить только указанные сценарии'
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+        parser.add_argument(
+            '--compare', metavar='PATH',
+            help='Файл с результатами для сравнения'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост p95 задержки при сравнении'
+        )
+
+    def get_user(self, email):
+        users = User.objects.filter(recipes_count__gt=0)
+        if email:
+            users = User.objects.filter(email=email)
+        user = users.order_by('-followers_count', 'id').first()
+        if user is None:
+            raise CommandError(
+                'Нет данных для замеров: выполните команду generate.'
+            )
+        return user
+
+    def get_scenarios(self, user, password):
+        author = User.objects.filter(recipes_count__gt=0).exclude(
+            pk=user.pk
+        ).exclude(following__user=user).order_by('-recipes_count').first()
+        recipe = Recipe.objects.exclude(
+            favorite_recipe__user=user
+        ).exclude(shopping_cart__user=user).order_by('-pub_date').first()
+        if author is None or recipe is None:
+            raise CommandError(
+                'Недостаточно данных для замеров: увеличьте объем generate.'
+            )
+        own_recipe = Recipe.objects.filter(author=user).first()
+        tags = list(Tag.objects.values_list('id', 'slug')[:2])
+        ingredients = list(Ingredient.objects.values_list('id', flat=True)[:5])
+        recipe_data = {
+            'name': 'Бенчмарк',
+            'text': 'Рецепт для замеров',
+            'cooking_time': 10,
+            'image': make_image(),
+            'tags': [pk for pk, _ in tags],
+            'ingredients': [
+                {'id': pk, 'amount': 10} for pk in ingredients
+            ]
+        }
+        name = Ingredient.objects.values_list('name', flat=True).first()
+        favorite = f'/api/recipes/{recipe.pk}/favorite/'
+        cart = f'/api/recipes/{recipe.pk}/shopping_cart/'
+        subscribe = f'/api/users/{author.pk}/subscribe/'
+        token = Token.objects.get(user=user).key
+        password_data = {
+            'current_password': password, 'new_password': password
+        }
+        return [
+            {'name': 'users-list', 'path': '/api/users/'},
+            {'name': 'users-detail', 'path': f'/api/users/{author.pk}/'},
+            {'name': 'users-me', 'path': '/api/users/me/'},
+            {
+                'name': 'users-create', 'method': 'post', 'auth': False,
+                'path': '/api/users/',
+                'data': lambda number: {
+                    'email': f'benchmark-new{number}@example.com',
+                    'username': f'benchmark-new{number}',
+                    'first_name': 'Бенчмарк',
+                    'last_name': 'Бенчмарк',
+                    'password': password
+                },
+                'cleanup': lambda client, response: User.objects.filter(
+                    username__startswith='benchmark-new'
+                ).delete()
+            },
+            {
+                'name': 'subscriptions',
+                'path': '/api/users/subscriptions/?recipes_limit=3'
+            },
+            {
+                'name': 'subscribe', 'method': 'post', 'path': subscribe,
+                'cleanup': lambda client, response: client.delete(subscribe)
+            },
+            {
+                'name': 'unsubscribe', 'method': 'delete', 'path': subscribe,
+                'setup': lambda client: client.post(subscribe)
+            },
+            {'name': 'recipes-list-anonymous', 'auth': False,
+             'path': '/api/recipes/'},
+            {'name': 'recipes-list', 'path': '/api/recipes/'},
+            {'name': 'recipes-list-cursor', 'path': '/api/recipes/?cursor='},
+            {'name': 'recipes-favorited',
+             'path': '/api/recipes/?is_favorited=1'},
+            {'name': 'recipes-in-cart',
+             'path': '/api/recipes/?is_in_shopping_cart=1'},
+            {'name': 'recipes-tags', 'path': '/api/recipes/?' + '&'.join(
+                f'tags={slug}' for _, slug in tags
+            )},
+            {'name': 'recipes-author',
+             'path': f'/api/recipes/?author={author.pk}'},
+            {'name': 'recipes-search',
+             'path': '/api/recipes/?search=' + recipe.name.split()[0]},
+            {'name': 'recipes-detail', 'path': f'/api/recipes/{recipe.pk}/'},
+            {
+                'name': 'recipes-create', 'method': 'post',
+                'path': '/api/recipes/', 'data': recipe_data,
+                'cleanup': lambda client, response: client.delete(
+                    f'/api/recipes/{response.json()["id"]}/'
+                )
+            },
+            {
+                'name': 'recipes-update', 'method': 'patch',
+                'path': f'/api/recipes/{own_recipe.pk}/' if own_recipe
+                else None,
+                'data': {
+                    key: value for key, value in recipe_data.items()
+                    if key != 'image'
+                }
+            },
+            {
+                'name': 'favorite', 'method': 'post', 'path': favorite,
+                'cleanup': lambda client, response: client.delete(favorite)
+            },
+            {
+                'name': 'unfavorite', 'method': 'delete', 'path': favorite,
+                'setup': lambda client: client.post(favorite)
+            },
+            {
+                'name': 'shopping-cart', 'method': 'post', 'path': cart,
+                'cleanup': lambda client, response: client.delete(cart)
+            },
+            {
+                'name': 'shopping-cart-remove', 'method': 'delete',
+                'path': cart, 'setup': lambda client: client.post(cart)
+            },
+            *(
+                {
+                    'name': f'download-shopping-cart-{export_format}',
+                    'path': '/api/recipes/download_shopping_cart/'
+                            f'?format={export_format}'
+                }
+                for export_format in ('txt', 'csv', 'pdf')
+            ),
+            {'name': 'ingredients-list', 'auth': False,
+             'path': '/api/ingredients/'},
+            {'name': 'ingredients-search', 'auth': False,
+             'path': f'/api/ingredients/?name={name[:3]}'},
+            {'name': 'tags-list', 'auth': False, 'path': '/api/tags/'},
+            {'name': 'tags-detail', 'auth': False,
+             'path': f'/api/tags/{tags[0][0]}/' if tags else None},
+            {
+                'name': 'login', 'method': 'post', 'auth': False,
+                'path': '/api/auth/token/login/',
+                'data': {'email': user.email, 'password': password}
+            },
+            {
+                'name': 'logout', 'method': 'post',
+                'path': '/api/auth/token/logout/',
+                'cleanup': lambda client, response: (
+                    Token.objects.get_or_create(user=user, key=token)
+                )
+            },
+            {
+                'name': 'set-password', 'method': 'post',
+                'path': '/api/users/set_password/', 'data': password_data
+            },
+        ]
+
+    def measure(self, client, scenario, iterations, warmup, user):
+        method = getattr(client, scenario.get('method', 'get'))
+        data = scenario.get('data')
+        latencies, queries, statuses = [], [], Counter()
+        for number in range(warmup + iterations):
+            reset_auth_throttles('127.0.0.1', user.email)
+            if 'setup' in scenario:
+                scenario['setup'](client)
+            kwargs = {}
+            if data is not None:
+                kwargs = {
+                    'data': data(number) if callable(data) else data,
+                    'format': 'json'
+                }
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = method(scenario['path'], **kwargs)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - start
+            count = len(context.captured_queries)
+            if 'cleanup' in scenario and response.status_code < 400:
+                scenario['cleanup'](client, response)
+            if number < warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(count)
+            statuses[response.status_code] += 1
+        return {
+            'iterations': iterations,
+            'statuses': {
+                str(code): count for code, count in sorted(statuses.items())
+            },
+            'latency_ms': {
+                'min': min(latencies),
+                'mean': sum(latencies) / len(latencies),
+                **{
+                    f'p{percent}': percentile(latencies, percent)
+                    for percent in PERCENTILES
+                },
+                'max': max(latencies)
+            },
+            'queries': {
+                'min': min(queries),
+                'median': percentile(queries, 50),
+                'max': max(queries)
+            },
+            'throughput_rps': iterations / (sum(latencies) / 1000)
+        }
+
+    def get_meta(self, options):
+        return {
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'scale': {
+                'users': User.objects.count(),
+                'recipes': Recipe.objects.count(),
+                'ingredients': Ingredient.objects.count(),
+                'tags': Tag.objects.count()
+            }
+        }
+
+    def compare(self, results, path, threshold):
+        with open(path, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before, after = baseline[name], result
+            p95 = before['latency_ms']['p95'], after['latency_ms']['p95']
+            queries = before['queries']['max'], after['queries']['max']
+            if p95[1] > p95[0] * (1 + threshold):
+                regressions.append(
+                    f'{name}: p95 {p95[0]:.1f} -> {p95[1]:.1f} мс'
+                )
+            if queries[1] > queries[0]:
+                regressions.append(
+                    f'{name}: запросов {queries[0]} -> {queries[1]}'
+                )
+        return regressions
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('Число итераций должно быть больше нуля.')
+        user = self.get_user(options['user'])
+        if not user.check_password(options['password']):
+            raise CommandError(f'Неверный пароль пользователя {user.email}.')
+        token, _ = Token.objects.get_or_create(user=user)
+        anonymous, authorized = APIClient(), APIClient()
+        authorized.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        results = {}
+        for scenario in self.get_scenarios(user, options['password']):
+            if options['only'] and scenario['name'] not in options['only']:
+                continue
+            if scenario['path'] is None:
+                self.stdout.write(f'{scenario["name"]}: пропущен')
+                continue
+            client = authorized if scenario.get('auth', True) else anonymous
+            result = self.measure(
+                client, scenario, options['iterations'], options['warmup'],
+                user
+            )
+            results[scenario['name']] = result
+            latency = result['latency_ms']
+            self.stdout.write(
+                f'{scenario["name"]:<32} '
+                f'p50 {latency["p50"]:7.1f} мс  '
+                f'p95 {latency["p95"]:7.1f} мс  '
+                f'запросов {result["queries"]["max"]:3}  '
+                f'{result["throughput_rps"]:7.1f} rps  '
+                f'{result["statuses"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(
+                    {'meta': self.get_meta(options), 'results': results},
+                    file, ensure_ascii=False, indent=2
+                )
+        if options['compare']:
+            regressions = self.compare(
+                results, options['compare'], options['threshold']
+            )
+            if regressions:
+                raise CommandError(
+                    'Обнаружены регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий не обнаружено.'))
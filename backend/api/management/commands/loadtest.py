@@ -0,0 +1,104 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from django.core.management import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from api.management.commands.benchmark import percentile
+from recipes.models import Ingredient, Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочный тест читающих эндпоинтов запущенного сервера'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Число запросов на каждый сценарий'
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+
+    def get_scenarios(self):
+        user = User.objects.filter(shopping_cart__isnull=False).first()
+        recipe = Recipe.objects.order_by('-pub_date').first()
+        ingredient = Ingredient.objects.values_list('name', flat=True).first()
+        if user is None or recipe is None or ingredient is None:
+            raise CommandError(
+                'Нет данных для замеров: выполните команду generate.'
+            )
+        token, _ = Token.objects.get_or_create(user=user)
+        headers = {'Authorization': f'Token {token.key}'}
+        return {
+            'recipes-list-anonymous': ('/api/recipes/?limit=6', {}),
+            'recipes-list': ('/api/recipes/?limit=6', headers),
+            'recipes-detail': (f'/api/recipes/{recipe.pk}/', headers),
+            'tags-list': ('/api/tags/', {}),
+            'ingredients-search': (
+                f'/api/ingredients/?name={quote(ingredient[:3])}', {}
+            ),
+            'download-shopping-cart': (
+                '/api/recipes/download_shopping_cart/', headers
+            ),
+        }
+
+    def fetch(self, url, headers):
+        start = time.perf_counter()
+        try:
+            with urlopen(Request(url, headers=headers)) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            status = error.code
+        return time.perf_counter() - start, status
+
+    def run(self, url, headers, count, concurrency):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(
+                lambda _: self.fetch(url, headers), range(count)
+            ))
+        elapsed = time.perf_counter() - start
+        latencies = [duration * 1000 for duration, _ in results]
+        errors = sum(status >= 400 for _, status in results)
+        return {
+            'requests': count,
+            'errors': errors,
+            'latency_ms': {
+                'mean': sum(latencies) / len(latencies),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+            },
+            'throughput_rps': count / elapsed
+        }
+
+    def handle(self, *args, **options):
+        results = {}
+        for name, (path, headers) in self.get_scenarios().items():
+            result = self.run(
+                options['base_url'].rstrip('/') + path, headers,
+                options['requests'], options['concurrency']
+            )
+            results[name] = result
+            latency = result['latency_ms']
+            self.stdout.write(
+                f'{name:<24} '
+                f'p50 {latency["p50"]:7.1f} мс  '
+                f'p99 {latency["p99"]:7.1f} мс  '
+                f'{result["throughput_rps"]:7.1f} rps  '
+                f'ошибок {result["errors"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'base_url': options['base_url'],
+                    'concurrency': options['concurrency'],
+                    'results': results
+                }, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,65 @@
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, float('inf'))
+
+REQUESTS = Counter(
+    'foodgram_http_requests_total',
+    'Запросы к API по маршруту, методу и статусу',
+    ['route', 'method', 'status']
+)
+LATENCY = Histogram(
+    'foodgram_http_request_duration_seconds',
+    'Время обработки запроса',
+    ['route', 'method']
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries_per_request',
+    'Число запросов к БД на один запрос к API',
+    ['route'],
+    buckets=QUERY_BUCKETS
+)
+DB_DURATION = Histogram(
+    'foodgram_db_duration_seconds',
+    'Время запросов к БД на один запрос к API',
+    ['route']
+)
+CACHE_REQUESTS = Counter(
+    'foodgram_cache_requests_total',
+    'Обращения к кэшу по результату: hit, miss или not_modified',
+    ['cache', 'result']
+)
+IN_PROGRESS = Gauge(
+    'foodgram_http_requests_in_progress',
+    'Запросы, обрабатываемые в данный момент',
+    multiprocess_mode='livesum'
+)
+WORKERS = Gauge(
+    'foodgram_workers',
+    'Запущенные процессы приложения',
+    multiprocess_mode='livesum'
+)
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    WORKERS.set(1)
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    if token and request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,290 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+
+from api.db import pin_to_primary
+from api.metrics import (DB_DURATION, DB_QUERIES, IN_PROGRESS, LATENCY,
+                         REQUESTS)
+
+logger = logging.getLogger('api.profiling')
+
+PLACEHOLDERS = re.compile(r'%s(, %s)+')
+NUMBERS = re.compile(r'\b\d+\b')
+SPACES = re.compile(r'\s+')
+
+active_counters = ContextVar('active_counters', default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.url_name if match else None
+
+
+def get_fingerprint(sql):
+    sql = PLACEHOLDERS.sub('%s, ...', sql)
+    return SPACES.sub(' ', NUMBERS.sub('?', sql)).strip()
+
+
+def count_queries(execute, sql, params, many, context):
+    counters = active_counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for counter in counters:
+            counter.add(sql, duration)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0
+
+    def add(self, sql, duration):
+        self.db_time += duration
+        self.count += 1
+        self.record(sql)
+
+    def record(self, sql):
+        pass
+
+    def activate(self):
+        return active_counters.set(active_counters.get() + (self,))
+
+    def deactivate(self, token):
+        active_counters.reset(token)
+
+
+class RequestProfile(QueryCounter):
+
+    def __init__(self):
+        super().__init__()
+        self.start = time.perf_counter()
+        self.view_start = self.render_start = self.render_end = None
+        self.serializer_time = 0
+        self.queries = Counter()
+
+    def record(self, sql):
+        self.queries[get_fingerprint(sql)] += 1
+
+    def get_duplicates(self):
+        return {
+            fingerprint: count
+            for fingerprint, count in self.queries.most_common()
+            if count > 1
+        }
+
+    def time_serializer(self, serializer):
+        to_representation = serializer.to_representation
+
+        @wraps(to_representation)
+        def timed(*args, **kwargs):
+            start, db_time = time.perf_counter(), self.db_time
+            try:
+                return to_representation(*args, **kwargs)
+            finally:
+                self.serializer_time += max(
+                    time.perf_counter() - start - (self.db_time - db_time), 0
+                )
+
+        serializer.to_representation = timed
+
+    def get_timings(self):
+        total = time.perf_counter() - self.start
+        timings = {'db': self.db_time}
+        if self.view_start is not None:
+            view_end = self.render_start or self.start + total
+            timings['app'] = max(
+                view_end - self.view_start - self.db_time
+                - self.serializer_time, 0
+            )
+            timings['serializer'] = self.serializer_time
+        if self.render_end is not None:
+            timings['render'] = self.render_end - self.render_start
+        timings['total'] = total
+        return timings
+
+
+class SerializerTimingMixin:
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        profile = getattr(self.request, 'profile', None)
+        if profile is not None:
+            profile.time_serializer(serializer)
+        return serializer
+
+
+class QueryProfilingMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.QUERY_PROFILING:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = request.profile = RequestProfile()
+        token = profile.activate()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.deactivate(token)
+        self.report(request, response, profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'profile'):
+            request.profile.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        if hasattr(request, 'profile'):
+            profile = request.profile
+            profile.render_start = time.perf_counter()
+
+            def render_finished(response):
+                profile.render_end = time.perf_counter()
+
+            response.add_post_render_callback(render_finished)
+        return response
+
+    def report(self, request, response, profile):
+        timings = profile.get_timings()
+        duplicates = profile.get_duplicates()
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.1f}' + (
+                f';desc="{profile.count} queries"' if name == 'db' else ''
+            )
+            for name, duration in timings.items()
+        )
+        response['X-Query-Count'] = profile.count
+        response['X-Duplicate-Queries'] = sum(duplicates.values())
+        route = get_route(request)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'queries': profile.count,
+            'duplicates': duplicates,
+            **{
+                f'{name}_ms': round(duration * 1000, 1)
+                for name, duration in timings.items()
+            }
+        }, ensure_ascii=False))
+        budget = (
+            settings.QUERY_BUDGETS.get(route)
+            if request.method in SAFE_METHODS else None
+        )
+        if budget is None or profile.count <= budget:
+            return
+        message = (
+            f'{route}: {profile.count} запросов к БД '
+            f'при бюджете {budget}.'
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = counter.activate()
+        start = time.perf_counter()
+        try:
+            with IN_PROGRESS.track_inprogress():
+                response = self.get_response(request)
+        finally:
+            counter.deactivate(token)
+        self.observe(request, response, counter, start)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = counter.activate()
+        start = time.perf_counter()
+        try:
+            with IN_PROGRESS.track_inprogress():
+                response = await self.get_response(request)
+        finally:
+            counter.deactivate(token)
+        self.observe(request, response, counter, start)
+        return response
+
+    def observe(self, request, response, counter, start):
+        route = get_route(request) or 'unmatched'
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        LATENCY.labels(route, request.method).observe(
+            time.perf_counter() - start
+        )
+        DB_QUERIES.labels(route).observe(counter.count)
+        DB_DURATION.labels(route).observe(counter.db_time)
+
+
+class ReplicaPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.pin(request, response)
+        return response
+
+    def pin(self, request, response):
+        user = getattr(request, 'user', None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user)
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from users.models import User
+
+RATE_KEY = 'password_hashing:{}'
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix='password-hashing'
+)
+slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASHING_WORKERS + settings.PASSWORD_HASHING_QUEUE
+)
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Сервис перегружен, повторите попытку позже.'
+    default_code = 'hashing_unavailable'
+
+
+def take_rate_slot():
+    if not settings.PASSWORD_HASHING_RATE:
+        return True
+    key = RATE_KEY.format(int(time.time()))
+    cache.add(key, 0, 2)
+    try:
+        return cache.incr(key) <= settings.PASSWORD_HASHING_RATE
+    except ValueError:
+        return True
+
+
+def run_hashing(func, *args, **kwargs):
+    if not take_rate_slot() or not slots.acquire(blocking=False):
+        raise HashingUnavailable()
+    try:
+        return executor.submit(func, *args, **kwargs).result()
+    finally:
+        slots.release()
+
+
+def authenticate_user(email, password):
+    try:
+        user = User.objects.get_by_natural_key(email)
+    except User.DoesNotExist:
+        hash_password(password)
+        return None
+    if check_password(user, password) and user.is_active:
+        return user
+    return None
+
+
+def check_password(user, password):
+    upgrades = []
+    if not run_hashing(
+        hashers.check_password, password, user.password, upgrades.append
+    ):
+        return False
+    if upgrades:
+        user.password = hash_password(password)
+        user.save(update_fields=['password'])
+    return True
+
+
+def hash_password(password):
+    return run_hashing(hashers.make_password, password)
@@ -1,15 +1,17 @@
 import django.contrib.auth.password_validation as validators
 from django.db import transaction
-from django.contrib.auth import authenticate
-from django.contrib.auth.hashers import make_password
-from django.shortcuts import get_object_or_404
+from django.core.files.storage import default_storage
 from djoser.serializers import UserCreateSerializer, UserSerializer
-from drf_base64.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueTogetherValidator
+from api.fields import Base64ImageField
+from api.passwords import authenticate_user, check_password, hash_password
+from api.shopping_list import invalidate_shopping_lists_on_commit
 from recipes.models import (Ingredient, Recipe, RecipeIngredient,
                             Tag, ShoppingCart, FavoriteRecipe)
+from recipes.images import schedule_image_processing
+from recipes.search import update_search_index
 from users.models import Subscribe, User
 
 ERR_MSG = 'Не удается войти в систему с предоставленными учетными данными.'
@@ -29,7 +31,7 @@ class TokenSerializer(serializers.Serializer):
         email = attrs.get('email')
         password = attrs.get('password')
         if email and password:
-            user = authenticate(email=email, password=password)
+            user = authenticate_user(email, password)
             if not user:
                 raise serializers.ValidationError(
                     ERR_MSG,
@@ -56,6 +58,8 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context['request'].user
         if not user.is_authenticated:
             return False
@@ -82,7 +86,7 @@ class UserPasswordSerializer(serializers.Serializer):
 
     def validate_current_password(self, current_password):
         user = self.context['request'].user
-        if not authenticate(username=user.email, password=current_password):
+        if not check_password(user, current_password):
             raise serializers.ValidationError(ERR_MSG, code='authorization')
         return current_password
 
@@ -93,8 +97,7 @@ class UserPasswordSerializer(serializers.Serializer):
     @transaction.atomic
     def create(self, validated_data):
         user = self.context['request'].user
-        password = make_password(validated_data.get('new_password'))
-        user.password = password
+        user.password = hash_password(validated_data.get('new_password'))
         user.save()
         return validated_data
 
@@ -115,7 +118,7 @@ class IngredientSerializer(serializers.ModelSerializer):
 
 class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
 
-    id = serializers.CharField(source='ingredient')
+    id = serializers.IntegerField(source='ingredient')
 
     class Meta:
         model = RecipeIngredient
@@ -141,9 +144,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         default=serializers.CurrentUserDefault()
     )
     image = Base64ImageField(max_length=None, use_url=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=Tag.objects.all()
-    )
+    tags = serializers.ListField(child=serializers.IntegerField())
     ingredients = RecipeIngredientWriteSerializer(many=True)
 
     class Meta:
@@ -156,24 +157,34 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         read_only_fields = ('author',)
 
     def validate(self, data):
-        ingredients = data['ingredients']
-        ingredient_list = []
-        for items in ingredients:
-            ingredient = get_object_or_404(Ingredient, id=items['ingredient'])
-            if ingredient in ingredient_list:
+        if 'ingredients' in data:
+            ingredient_ids = [
+                item['ingredient'] for item in data['ingredients']
+            ]
+            if len(set(ingredient_ids)) != len(ingredient_ids):
                 raise serializers.ValidationError(
                     'Ингредиент должен быть уникальным!'
                 )
-            ingredient_list.append(ingredient)
-        tags = data['tags']
-        if not tags:
-            raise serializers.ValidationError(
-                'Нужен хотя бы один тэг для рецепта!'
-            )
-        for tag_name in tags:
-            if not Tag.objects.filter(name=tag_name).exists():
+            found = Ingredient.objects.in_bulk(ingredient_ids)
+            missing = [pk for pk in ingredient_ids if pk not in found]
+            if missing:
+                raise serializers.ValidationError(
+                    'Ингредиентов с id '
+                    f'{", ".join(map(str, missing))} не существует!'
+                )
+        if 'tags' in data:
+            tag_ids = list(dict.fromkeys(data['tags']))
+            if not tag_ids:
                 raise serializers.ValidationError(
-                    f'Тэга {tag_name} не существует!')
+                    'Нужен хотя бы один тэг для рецепта!'
+                )
+            found = Tag.objects.in_bulk(tag_ids)
+            missing = [pk for pk in tag_ids if pk not in found]
+            if missing:
+                raise serializers.ValidationError(
+                    f'Тэгов с id {", ".join(map(str, missing))} не существует!'
+                )
+            data['tags'] = [found[pk] for pk in tag_ids]
         return data
 
     def validate_cooking_time(self, cooking_time):
@@ -205,6 +216,37 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         ]
         RecipeIngredient.objects.bulk_create(objs)
 
+    def update_ingredients(self, ingredients, recipe):
+        existing = {
+            row.ingredient_id: row
+            for row in RecipeIngredient.objects.filter(recipe=recipe)
+        }
+        amounts = {
+            ingredient['ingredient']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        changed = []
+        for ingredient_id, amount in amounts.items():
+            row = existing.get(ingredient_id)
+            if row is not None and row.amount != amount:
+                row.amount = amount
+                changed.append(row)
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ['amount'])
+        self.create_ingredients(
+            [
+                ingredient for ingredient in ingredients
+                if ingredient['ingredient'] not in existing
+            ],
+            recipe
+        )
+        removed = [
+            row.pk for ingredient_id, row in existing.items()
+            if ingredient_id not in amounts
+        ]
+        if removed:
+            RecipeIngredient.objects.filter(pk__in=removed).delete()
+
     @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
@@ -212,32 +254,63 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         self.create_ingredients(ingredients, recipe)
+        update_search_index([recipe.id])
+        schedule_image_processing(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if 'ingredients' in validated_data:
             ingredients = validated_data.pop('ingredients')
-            instance.ingredients.clear()
-            self.create_ingredients(ingredients, instance)
+            self.update_ingredients(ingredients, instance)
+            invalidate_shopping_lists_on_commit(instance)
         if 'tags' in validated_data:
             instance.tags.set(
                 validated_data.pop('tags')
             )
-        return super().update(instance, validated_data)
+        if 'image' in validated_data:
+            instance.thumbnails = {}
+            schedule_image_processing(instance)
+        instance = super().update(instance, validated_data)
+        update_search_index([instance.id])
+        return instance
 
     def to_representation(self, instance):
+        request = self.context.get('request')
+        instance = Recipe.objects.for_feed(request.user).get(pk=instance.pk)
         return RecipeSerializer(
             instance,
-            context={
-                'request': self.context.get('request'),
-                'follow': Subscribe.objects.all(),
-                'favorite': FavoriteRecipe.objects.all(),
-                'shopping_cart': ShoppingCart.objects.all()
-            }).data
+            context={'request': request}
+        ).data
+
+
+class RecipeImageMixin:
+
+    def get_image_url(self, name):
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_image(self, obj):
+        name = obj.thumbnails.get('full')
+        if name is None:
+            if not obj.image:
+                return None
+            name = obj.image.name
+        return self.get_image_url(name)
 
+    def get_thumbnails(self, obj):
+        return {
+            size: self.get_image_url(name)
+            for size, name in obj.thumbnails.items()
+        }
 
-class RecipeSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
+
+class RecipeSerializer(RecipeImageMixin, serializers.ModelSerializer):
+    image = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
     author = CustomUserSerializer(
         read_only=True,
@@ -248,8 +321,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         required=True,
         source='recipe'
     )
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
+    is_favorited = serializers.BooleanField(read_only=True)
+    is_in_shopping_cart = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Recipe
@@ -262,26 +335,20 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'thumbnails',
             'text',
             'cooking_time'
         )
 
-    def get_is_in_shopping_cart(self, obj):
-        user = self.context['request'].user
-        shopping_cart = self.context['shopping_cart']
-        return shopping_cart.filter(recipe=obj, user=user).exists()
-
-    def get_is_favorited(self, obj):
-        user = self.context['request'].user
-        favorite = self.context['favorite']
-        return favorite.filter(recipe=obj, user=user).exists()
-
 
-class SubscribeRecipeSerializer(serializers.ModelSerializer):
+class SubscribeRecipeSerializer(RecipeImageMixin,
+                                serializers.ModelSerializer):
+    image = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'thumbnails', 'cooking_time')
 
 
 class SubscribeSerializer(serializers.ModelSerializer):
@@ -297,15 +364,19 @@ class SubscribeSerializer(serializers.ModelSerializer):
         ]
 
     def to_representation(self, instance):
-        return SubscribeShowSerializer(instance.author, context={
-            'request': self.context.get('request')
+        request = self.context.get('request')
+        author = User.objects.filter(pk=instance.author_id).with_subscription(
+            request.user
+        ).with_recipes(request.query_params.get('recipes_limit')).get()
+        return SubscribeShowSerializer(author, context={
+            'request': request
         }).data
 
 
 class SubscribeShowSerializer(serializers.ModelSerializer):
     recipes = serializers.SerializerMethodField()
-    is_subscribed = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    is_subscribed = serializers.BooleanField(read_only=True)
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = User
@@ -315,21 +386,7 @@ class SubscribeShowSerializer(serializers.ModelSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        recipes = Recipe.objects.filter(author=obj)
-        limit = request.query_params.get('recipes_limit')
-        if limit:
-            recipes = recipes[:int(limit)]
-        return SubscribeRecipeSerializer(recipes, many=True).data
-
-    def get_is_subscribed(self, obj):
-        user = self.context['request'].user
-        return Subscribe.objects.filter(
-            user=user, author=obj).exists()
-
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
+        return SubscribeRecipeSerializer(obj.limited_recipes, many=True).data
 
 
 class ShoppingCartSerializer(serializers.ModelSerializer):
@@ -0,0 +1,63 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from api.cache import bump_version, get_versions
+from api.metrics import CACHE_REQUESTS
+from recipes.models import ShoppingCart
+
+CACHE_KEY = 'shopping_list:{}:{!r}:{!r}'
+
+
+def get_cache_key(user_id):
+    return CACHE_KEY.format(
+        user_id, *get_versions(f'user:{user_id}', 'ingredients')
+    )
+
+
+def build_amounts(user):
+    rows = (
+        ShoppingCart.objects.filter(user=user).
+        values(
+            'recipe__ingredients__name',
+            'recipe__ingredients__measurement_unit'
+        ).annotate(amount=Sum('recipe__recipe__amount')).order_by())
+    return Counter({
+        (row['recipe__ingredients__name'],
+         row['recipe__ingredients__measurement_unit']): row['amount']
+        for row in rows.iterator()
+    })
+
+
+def get_shopping_list(user):
+    key = get_cache_key(user.id)
+    amounts = cache.get(key)
+    if amounts is None:
+        CACHE_REQUESTS.labels('shopping_list', 'miss').inc()
+        amounts = build_amounts(user)
+        cache.set(key, amounts, settings.SHOPPING_LIST_CACHE_TIMEOUT)
+    else:
+        CACHE_REQUESTS.labels('shopping_list', 'hit').inc()
+    return [
+        {
+            'recipe__ingredients__name': name,
+            'recipe__ingredients__measurement_unit': measurement_unit,
+            'amount': amount
+        }
+        for (name, measurement_unit), amount in sorted(amounts.items())
+    ]
+
+
+def invalidate_shopping_lists(recipe):
+    user_ids = set(ShoppingCart.objects.filter(
+        recipe=recipe
+    ).values_list('user_id', flat=True))
+    if user_ids:
+        bump_version(*(f'user:{user_id}' for user_id in user_ids))
+
+
+def invalidate_shopping_lists_on_commit(recipe):
+    transaction.on_commit(lambda: invalidate_shopping_lists(recipe))
@@ -0,0 +1,70 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def hash_email(email):
+    return hashlib.sha256(email.lower().encode()).hexdigest()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        now = time.time()
+        refill = self.num_requests / self.duration
+        tokens, updated = self.cache.get(self.key, (self.num_requests, now))
+        tokens = min(self.num_requests, tokens + (now - updated) * refill)
+        if tokens < 1:
+            self.remaining = (1 - tokens) / refill
+            return False
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.remaining
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
+
+
+class AuthEmailThrottle(TokenBucketThrottle):
+    scope = 'auth_email'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            email = request.user.email
+        elif hasattr(request.data, 'get'):
+            email = request.data.get('email')
+        else:
+            email = None
+        if not isinstance(email, str) or not email:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hash_email(email)
+        }
+
+
+def reset_auth_throttles(ident, email):
+    cache.delete_many([
+        AuthIPThrottle.cache_format % {
+            'scope': AuthIPThrottle.scope, 'ident': ident
+        },
+        AuthEmailThrottle.cache_format % {
+            'scope': AuthEmailThrottle.scope, 'ident': hash_email(email)
+        },
+    ])
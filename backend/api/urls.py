@@ -11,6 +11,8 @@ from api.views import (
     AuthToken,
     set_password
 )
+from api.async_views import wrap_read_routes
+from api.metrics import metrics
 
 app_name = 'api'
 
@@ -24,11 +26,11 @@ router.register('tags', TagViewSet, basename='tags')
 router.register('users', CustomUserViewSet)
 
 urlpatterns = [
+    re_path(r'^metrics/?$', metrics, name='metrics'),
     path('users/set_password/', set_password, name='set_password'),
-    path('auth/token/login/', AuthToken.as_view(), name='login'),
-    path('', include(router.urls)),
+    re_path(r'^auth/token/login/?$', AuthToken.as_view(), name='login'),
+    path('', include(wrap_read_routes(router.urls))),
     path('', include('djoser.urls')),
     re_path(r'^auth/token/logout/?$', TokenDestroyView.as_view(),
             name='logout'),
-    path('auth/', include('djoser.urls.authtoken')),
 ]
@@ -1,55 +1,73 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, throttle_classes
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import (
     AllowAny,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly
 )
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from recipes.models import (Ingredient, Tag, Recipe,
                             FavoriteRecipe, ShoppingCart)
+from recipes.search import update_search_index
 from users.models import Subscribe, User
-from django.db.models import Sum
+from api.cache import AnonymousCacheMixin, ConditionalGetMixin
+from api.db import ReplicaReadMixin
+from api.exporters import EXPORTERS
 from api.filters import IngredientFilter, RecipeFilter
+from api.ingredient_index import ingredient_index
+from api.middleware import SerializerTimingMixin
+from api.pagination import RecipePagination
 from api.permissions import ReadOnly
+from api.renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
+from api.shopping_list import get_shopping_list
 from api.serializers import (CustomUserSerializer,
                              CustomUserWriteSerializer, UserPasswordSerializer,
                              IngredientSerializer, TokenSerializer,
                              TagSerializer, RecipeWriteSerializer,
                              RecipeSerializer, SubscribeSerializer,
+                             SubscribeShowSerializer,
                              ShoppingCartSerializer, FavoriteRecipeSerializer)
+from api.throttling import AuthEmailThrottle, AuthIPThrottle
 
-FILENAME = 'my_shopping_cart.txt'
+FILENAME = 'my_shopping_cart'
 
 
-class SubscribeViewSet(viewsets.ModelViewSet):
-    serializer_class = SubscribeSerializer
+class SubscribeViewSet(SerializerTimingMixin, ReplicaReadMixin,
+                       ConditionalGetMixin, viewsets.ModelViewSet):
+    cache_groups = ('recipes', 'users')
+    serializer_class = SubscribeShowSerializer
     permission_classes = [IsAuthenticated, ReadOnly]
 
     def get_queryset(self):
-        review = Subscribe.objects.filter(user=self.request.user)
-        return review
-
-    def get_serializer_context(self):
-        context = super(SubscribeViewSet, self).get_serializer_context()
-        followers = Subscribe.objects.all()
-        context.update({'follow': followers})
-        return context
+        user = self.request.user
+        return User.objects.filter(
+            following__user=user
+        ).order_by('-following__id').with_subscription(user).with_recipes(
+            self.request.query_params.get('recipes_limit')
+        )
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(SerializerTimingMixin, ReplicaReadMixin,
+                    AnonymousCacheMixin, viewsets.ModelViewSet):
+    cache_groups = ('recipes', 'tags', 'ingredients', 'users')
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
     filterset_class = RecipeFilter
     filter_backends = [DjangoFilterBackend]
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = RecipePagination
+
+    def get_queryset(self):
+        return Recipe.objects.for_feed(self.request.user)
 
     def get_serializer_class(self):
         if self.action in ['create', 'partial_update']:
@@ -63,19 +81,20 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
-    def get_serializer_context(self):
-        context = super(RecipeViewSet, self).get_serializer_context()
-        followers = Subscribe.objects.all()
-        favorite = FavoriteRecipe.objects.all()
-        shopping_cart = ShoppingCart.objects.all()
-        context.update(
-            {
-                'follow': followers,
-                'favorite': favorite,
-                'shopping_cart': shopping_cart
-            }
-        )
-        return context
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            getattr(response, 'exception', False)
+            and self.action == 'download_shopping_cart'
+        ):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        recipe_id = instance.id
+        instance.delete()
+        update_search_index([recipe_id])
 
     @action(
         detail=True,
@@ -88,7 +107,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
                 recipe = get_object_or_404(Recipe, pk=pk)
-                serializer.save(user=self.request.user, recipe=recipe)
+                with transaction.atomic():
+                    serializer.save(user=self.request.user, recipe=recipe)
                 return Response(serializer.data,
                                 status=status.HTTP_201_CREATED)
             return Response(serializer.errors,
@@ -119,7 +139,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
                 recipe = get_object_or_404(Recipe, pk=pk)
-                serializer.save(user=self.request.user, recipe=recipe)
+                with transaction.atomic():
+                    serializer.save(user=self.request.user, recipe=recipe)
                 return Response(serializer.data,
                                 status=status.HTTP_201_CREATED)
             return Response(serializer.errors,
@@ -140,34 +161,33 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-    @action(detail=False, methods=['get'],
-            permission_classes=[IsAuthenticated])
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        renderer_classes=[
+            PlainTextRenderer, CSVRenderer, PDFRenderer, JSONRenderer
+        ]
+    )
     def download_shopping_cart(self, request):
-        user = self.request.user
-        shopping_cart = (
-            ShoppingCart.objects.filter(user=user).
-            values(
-                'recipe__ingredients__name',
-                'recipe__ingredients__measurement_unit'
-            ).annotate(amount=Sum('recipe__recipe__amount')).order_by())
-        if shopping_cart:
-            shopping_list = (
-                'Список покупок: \n\n'
-            )
-            shopping_list += '\n'.join([
-                f'{index}. {recipe["recipe__ingredients__name"]} '
-                f'{recipe["amount"]} '
-                f'({recipe["recipe__ingredients__measurement_unit"]})'
-                for index, recipe in enumerate(shopping_cart, start=1)
-            ])
-        else:
-            shopping_list = ('Cписок покупок отсутствует!')
-        response = HttpResponse(shopping_list, content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename={FILENAME}'
+        shopping_cart = get_shopping_list(self.request.user)
+        export_format = request.accepted_renderer.format
+        if export_format not in EXPORTERS:
+            export_format = 'txt'
+        exporter, content_type = EXPORTERS[export_format]
+        response = StreamingHttpResponse(
+            exporter(shopping_cart),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename={FILENAME}.{export_format}'
+        )
         return response
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(SerializerTimingMixin, ReplicaReadMixin,
+                        AnonymousCacheMixin, viewsets.ModelViewSet):
+    cache_groups = ('ingredients',)
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = [DjangoFilterBackend]
@@ -175,15 +195,31 @@ class IngredientViewSet(viewsets.ModelViewSet):
     permission_classes = [ReadOnly]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            self.search, request, *args, **kwargs
+        )
+
+    def search(self, request, *args, **kwargs):
+        limit = request.query_params.get('limit', '')
+        return Response(ingredient_index.search(
+            request.query_params.get('name', ''),
+            int(limit) if limit.isdigit() else None
+        ))
+
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(SerializerTimingMixin, ReplicaReadMixin,
+                 AnonymousCacheMixin, viewsets.ModelViewSet):
+    cache_groups = ('tags',)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
     permission_classes = [ReadOnly]
 
 
-class CustomUserViewSet(UserViewSet):
+class CustomUserViewSet(SerializerTimingMixin, ConditionalGetMixin,
+                        UserViewSet):
+    cache_groups = ('users',)
     queryset = User.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = LimitOffsetPagination
@@ -234,7 +270,8 @@ class CustomUserViewSet(UserViewSet):
                         {'errors': 'Вы уже подписались!'},
                         status=status.HTTP_400_BAD_REQUEST,
                     )
-                serializer.save()
+                with transaction.atomic():
+                    serializer.save()
                 return Response(
                     serializer.data, status=status.HTTP_201_CREATED
                 )
@@ -259,6 +296,7 @@ class CustomUserViewSet(UserViewSet):
 class AuthToken(ObtainAuthToken):
     serializer_class = TokenSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [AuthIPThrottle, AuthEmailThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -272,6 +310,7 @@ class AuthToken(ObtainAuthToken):
 
 
 @api_view(['post'])
+@throttle_classes([AuthIPThrottle, AuthEmailThrottle])
 def set_password(request):
     serializer = UserPasswordSerializer(data=request.data,
                                         context={'request': request})
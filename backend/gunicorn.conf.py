@@ -0,0 +1,24 @@
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+
+def on_starting(server):
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+
+def post_fork(server, worker):
+    from api.metrics import WORKERS
+
+    WORKERS.set(1)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
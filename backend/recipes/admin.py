@@ -1,7 +1,9 @@
 from django.contrib import admin
 
+from api.shopping_list import invalidate_shopping_lists_on_commit
 from .models import (Ingredient, Tag, Recipe, RecipeIngredient,
                      FavoriteRecipe, ShoppingCart)
+from .search import search_filter, update_search_index
 
 
 class RecipeIngredientAdmin(admin.StackedInline):
@@ -18,11 +20,36 @@ class RecipeAdmin(admin.ModelAdmin):
     )
     search_fields = (
         'name', 'cooking_time',
-        'author__email', 'ingredients__name'
+        'author__email'
     )
     list_filter = ('pub_date', 'tags')
+    list_select_related = ('author',)
     inlines = (RecipeIngredientAdmin,)
 
+    def get_search_results(self, request, queryset, search_term):
+        results, use_distinct = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            results |= queryset.filter(search_filter(search_term))
+        return results, use_distinct
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        update_search_index([form.instance.pk])
+        if change:
+            invalidate_shopping_lists_on_commit(form.instance)
+
+    def delete_model(self, request, obj):
+        recipe_id = obj.pk
+        super().delete_model(request, obj)
+        update_search_index([recipe_id])
+
+    def delete_queryset(self, request, queryset):
+        recipe_ids = list(queryset.values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        update_search_index(recipe_ids)
+
     @admin.display(
         description='Электронная почта автора'
     )
@@ -45,7 +72,7 @@ class RecipeAdmin(admin.ModelAdmin):
 
     @admin.display(description='В избранном')
     def get_favorite_count(self, obj):
-        return obj.favorite_recipe.count()
+        return obj.favorites_count
 
 
 @admin.register(Tag)
@@ -61,12 +88,20 @@ class IngredientAdmin(admin.ModelAdmin):
     search_fields = ('name', 'measurement_unit')
     list_filter = ('name',)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'name' in form.changed_data:
+            update_search_index(
+                obj.ingredient.values_list('recipe_id', flat=True)
+            )
+
 
 @admin.register(FavoriteRecipe)
 class FavoriteRecipeAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'get_recipe', 'get_count')
     search_fields = ('recipe', 'user')
     list_filter = ('recipe', 'user')
+    list_select_related = ('user', 'recipe')
 
     @admin.display(description='Рецепты')
     def get_recipe(self, obj):
@@ -74,7 +109,7 @@ class FavoriteRecipeAdmin(admin.ModelAdmin):
 
     @admin.display(description='В избранных')
     def get_count(self, obj):
-        return obj.recipe.favorite_recipe.count()
+        return obj.recipe.favorites_count
 
 
 @admin.register(ShoppingCart)
@@ -82,6 +117,7 @@ class ShoppingCartAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'get_recipe', 'get_count')
     search_fields = ('recipe', 'user')
     list_filter = ('recipe', 'user')
+    list_select_related = ('user', 'recipe')
 
     @admin.display(description='Рецепты')
     def get_recipe(self, obj):
@@ -89,4 +125,4 @@ class ShoppingCartAdmin(admin.ModelAdmin):
 
     @admin.display(description='В избранных')
     def get_count(self, obj):
-        return obj.recipe.shopping_cart.count()
+        return obj.recipe.shopping_cart_count
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self):
+        from recipes.counters import (COUNTED_RELATIONS, backfill_counters,
+                                      decrement_counter, increment_counter)
+        from recipes.search import setup_search_index
+
+        post_migrate.connect(setup_search_index, sender=self)
+        post_migrate.connect(backfill_counters, sender=self)
+        for model in COUNTED_RELATIONS:
+            post_save.connect(increment_counter, sender=model)
+            post_delete.connect(decrement_counter, sender=model)
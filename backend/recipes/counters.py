@@ -0,0 +1,77 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.migrations.operations import AddField
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from recipes.models import FavoriteRecipe, Recipe, ShoppingCart
+from users.models import Subscribe, User
+
+COUNTER_FIELDS = {
+    ('recipe', 'favorites_count'),
+    ('recipe', 'shopping_cart_count'),
+    ('user', 'recipes_count'),
+    ('user', 'followers_count'),
+}
+
+
+def count_of(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by().
+            values(field).annotate(count=Count('pk')).values('count'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def recount(using=DEFAULT_DB_ALIAS):
+    with transaction.atomic(using=using):
+        recipes = Recipe.objects.using(using).update(
+            favorites_count=count_of(FavoriteRecipe, 'recipe'),
+            shopping_cart_count=count_of(ShoppingCart, 'recipe')
+        )
+        users = User.objects.using(using).update(
+            recipes_count=count_of(Recipe, 'author'),
+            followers_count=count_of(Subscribe, 'author')
+        )
+    return recipes, users
+
+
+def backfill_counters(plan=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    if any(
+        isinstance(operation, AddField)
+        and (operation.model_name_lower, operation.name_lower)
+        in COUNTER_FIELDS
+        for migration, backwards in plan or ()
+        if not backwards
+        for operation in migration.operations
+    ):
+        recount(using)
+
+
+COUNTED_RELATIONS = {
+    Recipe: ('author_id', User, 'recipes_count'),
+    FavoriteRecipe: ('recipe_id', Recipe, 'favorites_count'),
+    ShoppingCart: ('recipe_id', Recipe, 'shopping_cart_count'),
+    Subscribe: ('author_id', User, 'followers_count'),
+}
+
+
+def change_counter(sender, instance, value, using):
+    key, model, field = COUNTED_RELATIONS[sender]
+    model.objects.using(using).filter(pk=getattr(instance, key)).update(
+        **{field: value}
+    )
+
+
+def increment_counter(sender, instance, created, raw=False,
+                      using=DEFAULT_DB_ALIAS, **kwargs):
+    if created and not raw:
+        field = COUNTED_RELATIONS[sender][2]
+        change_counter(sender, instance, F(field) + 1, using)
+
+
+def decrement_counter(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    field = COUNTED_RELATIONS[sender][2]
+    change_counter(sender, instance, Greatest(F(field) - 1, 0), using)
@@ -0,0 +1,229 @@
+import logging
+import os
+import shutil
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from recipes.models import Recipe
+
+logger = logging.getLogger('recipes.images')
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+UPLOAD_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+CHUNK_SIZE = 64 * 1024
+ORIENTATION = 0x0112
+JPEG_APP0 = 0xE0
+JPEG_SCAN = (0xDA, 0xD9)
+JPEG_METADATA = (0xE1, 0xED, 0xFE)
+PNG_METADATA = (b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME')
+WEBP_METADATA = (b'EXIF', b'XMP ')
+WEBP_METADATA_FLAGS = 0x0C
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    global executor
+    if executor is None:
+        with executor_lock:
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=settings.RECIPE_IMAGE_WORKERS,
+                    thread_name_prefix='recipe-images'
+                )
+    return executor
+
+
+def render_variant(image, max_size):
+    variant = image.copy()
+    variant.thumbnail((max_size, max_size))
+    image_format = settings.RECIPE_IMAGE_FORMAT
+    if image_format == 'JPEG' or 'A' not in variant.getbands():
+        variant = variant.convert('RGB')
+    else:
+        variant = variant.convert('RGBA')
+    buffer = BytesIO()
+    variant.save(
+        buffer, image_format, quality=settings.RECIPE_IMAGE_QUALITY
+    )
+    return buffer.getvalue()
+
+
+def render_variants(image_file):
+    with image_file.open('rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    stem = PurePosixPath(image_file.name).with_suffix('')
+    extension = EXTENSIONS[settings.RECIPE_IMAGE_FORMAT]
+    return {
+        size: image_file.storage.save(
+            f'{stem}_{size}.{extension}',
+            ContentFile(render_variant(image, max_size))
+        )
+        for size, max_size in settings.RECIPE_IMAGE_SIZES.items()
+    }
+
+
+def process_recipe_image(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None or not recipe.image:
+        return
+    name = recipe.image.name
+    thumbnails = render_variants(recipe.image)
+    recipe.refresh_from_db(fields=['image'])
+    if recipe.image.name != name:
+        return
+    recipe.thumbnails = thumbnails
+    recipe.save(update_fields=['thumbnails'])
+
+
+def process_logged(recipe_id):
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception(
+            'Не удалось обработать изображение рецепта %s', recipe_id
+        )
+
+
+def process_in_worker(recipe_id):
+    try:
+        process_logged(recipe_id)
+    finally:
+        connections.close_all()
+
+
+def get_image_names(recipe):
+    names = list(recipe.thumbnails.values())
+    if recipe.image:
+        names.append(recipe.image.name)
+    return names
+
+
+def schedule_image_processing(recipe):
+    if settings.RECIPE_IMAGE_WORKERS:
+        transaction.on_commit(
+            lambda: get_executor().submit(process_in_worker, recipe.pk)
+        )
+    else:
+        transaction.on_commit(lambda: process_logged(recipe.pk))
+
+
+def copy_bytes(source, target, size):
+    while size > 0:
+        chunk = source.read(min(size, CHUNK_SIZE))
+        if not chunk:
+            raise ValueError('Неожиданный конец файла.')
+        target.write(chunk)
+        size -= len(chunk)
+
+
+def make_orientation_segment(orientation):
+    exif = Image.Exif()
+    exif[ORIENTATION] = orientation
+    data = b'Exif\x00\x00' + exif.tobytes()
+    return b'\xff\xe1' + struct.pack('>H', len(data) + 2) + data
+
+
+def strip_jpeg(source, target, orientation):
+    target.write(source.read(2))
+    pending = (
+        make_orientation_segment(orientation)
+        if orientation and orientation != 1 else b''
+    )
+    while True:
+        marker = source.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ValueError('Повреждена структура JPEG.')
+        while marker[1] == 0xFF:
+            marker = marker[1:] + source.read(1)
+        code = marker[1]
+        if code != JPEG_APP0:
+            target.write(pending)
+            pending = b''
+        if code in JPEG_SCAN:
+            target.write(marker)
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+            return
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            target.write(marker)
+            continue
+        length = source.read(2)
+        size = struct.unpack('>H', length)[0] - 2
+        if code in JPEG_METADATA:
+            source.seek(size, os.SEEK_CUR)
+            continue
+        target.write(marker + length)
+        copy_bytes(source, target, size)
+
+
+def strip_png(source, target):
+    target.write(source.read(8))
+    while True:
+        header = source.read(8)
+        if len(header) < 8:
+            return
+        size = struct.unpack('>I', header[:4])[0] + 4
+        if header[4:] in PNG_METADATA:
+            source.seek(size, os.SEEK_CUR)
+            continue
+        target.write(header)
+        copy_bytes(source, target, size)
+
+
+def strip_webp(source, target):
+    target.write(source.read(12))
+    while True:
+        header = source.read(8)
+        if len(header) < 8:
+            break
+        size = struct.unpack('<I', header[4:])[0]
+        size += size & 1
+        if header[:4] in WEBP_METADATA:
+            source.seek(size, os.SEEK_CUR)
+            continue
+        target.write(header)
+        if header[:4] == b'VP8X':
+            data = bytearray(source.read(size))
+            data[0] &= ~WEBP_METADATA_FLAGS & 0xFF
+            target.write(data)
+        else:
+            copy_bytes(source, target, size)
+    end = target.tell()
+    target.seek(4)
+    target.write(struct.pack('<I', end - 8))
+    target.seek(end)
+
+
+def strip_metadata(source, image_format):
+    source.seek(0)
+    orientation = None
+    if image_format == 'JPEG':
+        orientation = Image.open(source).getexif().get(ORIENTATION)
+        source.seek(0)
+    target = SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    try:
+        if image_format == 'JPEG':
+            strip_jpeg(source, target, orientation)
+        elif image_format == 'PNG':
+            strip_png(source, target)
+        elif image_format == 'WEBP':
+            strip_webp(source, target)
+        else:
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+    except Exception:
+        target.close()
+        raise
+    return target
@@ -0,0 +1,298 @@
+import csv
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import CommandError
+from django.db import connections, transaction
+from django.db.models import F
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.search import update_search_index
+from users.models import User
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    opened = False
+    while True:
+        buffer = buffer.lstrip(WHITESPACE + ',' if opened else WHITESPACE)
+        if buffer and not opened:
+            if buffer[0] != '[':
+                raise CommandError('Ожидается JSON-массив объектов.')
+            buffer = buffer[1:]
+            opened = True
+            continue
+        if buffer.startswith(']'):
+            return
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                item = None
+            if item is not None:
+                yield item
+                buffer = buffer[end:]
+                continue
+        if eof:
+            raise CommandError('Неожиданный конец JSON-файла.')
+        chunk = file.read(CHUNK_SIZE)
+        eof = not chunk
+        buffer += chunk
+
+
+def read_ndjson(file):
+    for line in file:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_csv(file):
+    yield from csv.DictReader(file)
+
+
+READERS = {
+    '.json': read_json,
+    '.ndjson': read_ndjson,
+    '.jsonl': read_ndjson,
+    '.csv': read_csv,
+}
+
+
+def read_rows(path):
+    path = Path(path)
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise CommandError(
+            f'Неизвестный формат файла {path.name}: '
+            f'поддерживаются {", ".join(READERS)}.'
+        )
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        yield from reader(file)
+
+
+def batched(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def as_list(value):
+    if isinstance(value, str):
+        return json.loads(value) if value else []
+    return value or []
+
+
+class Loader:
+    model = None
+    fields = ()
+    key = ()
+
+    def __init__(self, batch_size=1000, update=False):
+        self.batch_size = batch_size
+        self.update = update
+
+    def build(self, row):
+        return self.model(**{field: row[field] for field in self.fields})
+
+    def get_key(self, obj):
+        return tuple(getattr(obj, field) for field in self.key)
+
+    def get_row_key(self, row):
+        return tuple(row[field] for field in self.key)
+
+    def unique_rows(self, rows):
+        seen = set()
+        for row in rows:
+            key = self.get_row_key(row)
+            if key not in seen:
+                seen.add(key)
+                yield row
+
+    @transaction.atomic
+    def load_batch(self, rows):
+        objs = list({
+            self.get_key(obj): obj for obj in map(self.build, rows)
+        }.values())
+        if self.update:
+            self.update_existing(objs)
+        self.model.objects.bulk_create(objs, ignore_conflicts=True)
+        return len(objs)
+
+    def update_existing(self, objs):
+        updated = [field for field in self.fields if field not in self.key]
+        if not updated:
+            return
+        field = self.key[0]
+        existing = {
+            self.get_key(obj): obj
+            for obj in self.model.objects.filter(**{
+                f'{field}__in': [getattr(obj, field) for obj in objs]
+            })
+        }
+        changed = []
+        for obj in objs:
+            current = existing.get(self.get_key(obj))
+            if current is None:
+                continue
+            for field in updated:
+                setattr(current, field, getattr(obj, field))
+            changed.append(current)
+        self.model.objects.bulk_update(changed, updated)
+
+    def load(self, rows, workers=1):
+        started = time.monotonic()
+        total = 0
+        rows = self.unique_rows(rows)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = set()
+                for batch in batched(rows, self.batch_size):
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(
+                            pending, return_when=FIRST_COMPLETED
+                        )
+                        total += sum(future.result() for future in done)
+                    pending.add(executor.submit(self.load_in_worker, batch))
+                total += sum(future.result() for future in pending)
+        else:
+            for batch in batched(rows, self.batch_size):
+                total += self.load_batch(batch)
+        return total, time.monotonic() - started
+
+    def load_in_worker(self, rows):
+        try:
+            return self.load_batch(rows)
+        finally:
+            connections.close_all()
+
+
+class IngredientLoader(Loader):
+    model = Ingredient
+    fields = ('name', 'measurement_unit')
+    key = ('name', 'measurement_unit')
+
+
+class TagLoader(Loader):
+    model = Tag
+    fields = ('name', 'color', 'slug')
+    key = ('slug',)
+
+
+class UserLoader(Loader):
+    model = User
+    fields = ('email', 'username', 'first_name', 'last_name')
+    key = ('email',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.passwords = {}
+
+    def build(self, row):
+        user = super().build(row)
+        password = row.get('password')
+        if password not in self.passwords:
+            self.passwords[password] = make_password(password or None)
+        user.password = self.passwords[password]
+        return user
+
+
+class RecipeLoader(Loader):
+    model = Recipe
+    fields = ('name', 'text', 'cooking_time')
+    key = ('author_id', 'name')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ingredients = {
+            (name, measurement_unit): pk
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        }
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+
+    def get_row_key(self, row):
+        return row['author'], row['name']
+
+    @transaction.atomic
+    def load_batch(self, rows):
+        authors = dict(User.objects.filter(
+            email__in={row['author'] for row in rows}
+        ).values_list('email', 'id'))
+        recipes = {}
+        for row in rows:
+            if row['author'] not in authors:
+                raise CommandError(f'Автор {row["author"]} не найден.')
+            recipe = self.build(row)
+            recipe.author_id = authors[row['author']]
+            recipes[self.get_key(recipe)] = (recipe, row)
+        existing = set(Recipe.objects.filter(
+            author_id__in=authors.values(),
+            name__in={name for _, name in recipes}
+        ).values_list('author_id', 'name'))
+        new = {
+            key: value for key, value in recipes.items()
+            if key not in existing
+        }
+        Recipe.objects.bulk_create(recipe for recipe, _ in new.values())
+        ids = {
+            (author_id, name): pk
+            for pk, author_id, name in Recipe.objects.filter(
+                author_id__in=authors.values(),
+                name__in={name for _, name in new}
+            ).values_list('id', 'author_id', 'name')
+            if (author_id, name) in new
+        }
+        recipe_ingredients, recipe_tags, counts = [], [], {}
+        for key, (recipe, row) in new.items():
+            recipe_id = ids[key]
+            counts[recipe.author_id] = counts.get(recipe.author_id, 0) + 1
+            for item in as_list(row.get('ingredients')):
+                ingredient = (item['name'], item['measurement_unit'])
+                if ingredient not in self.ingredients:
+                    raise CommandError(
+                        f'Ингредиент {ingredient[0]} '
+                        f'({ingredient[1]}) не найден.'
+                    )
+                recipe_ingredients.append(RecipeIngredient(
+                    recipe_id=recipe_id,
+                    ingredient_id=self.ingredients[ingredient],
+                    amount=item['amount']
+                ))
+            for slug in as_list(row.get('tags')):
+                if slug not in self.tags:
+                    raise CommandError(f'Тэг {slug} не найден.')
+                recipe_tags.append(Recipe.tags.through(
+                    recipe_id=recipe_id, tag_id=self.tags[slug]
+                ))
+        RecipeIngredient.objects.bulk_create(recipe_ingredients)
+        Recipe.tags.through.objects.bulk_create(
+            recipe_tags, ignore_conflicts=True
+        )
+        for author_id, count in counts.items():
+            User.objects.filter(pk=author_id).update(
+                recipes_count=F('recipes_count') + count
+            )
+        update_search_index(ids.values())
+        return len(rows)
+
+
+LOADERS = {
+    'ingredients': IngredientLoader,
+    'tags': TagLoader,
+    'users': UserLoader,
+    'recipes': RecipeLoader,
+}
@@ -0,0 +1,52 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from recipes.images import get_image_names
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Удаление изображений рецептов, на которые нет ссылок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=60,
+            help='Не трогать файлы моложе указанного числа минут'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать файлы для удаления'
+        )
+
+    def walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        directories, files = storage.listdir(directory)
+        for name in files:
+            yield posixpath.join(directory, name)
+        for name in directories:
+            yield from self.walk(storage, posixpath.join(directory, name))
+
+    def handle(self, *args, **options):
+        field = Recipe._meta.get_field('image')
+        storage = field.storage
+        referenced = set()
+        for recipe in Recipe.objects.only('image', 'thumbnails').iterator():
+            referenced.update(get_image_names(recipe))
+        deadline = timezone.now() - timedelta(minutes=options['grace'])
+        removed = 0
+        for name in self.walk(storage, field.upload_to.rstrip('/')):
+            if name in referenced:
+                continue
+            if storage.get_modified_time(name) > deadline:
+                continue
+            if not options['dry_run']:
+                storage.delete(name)
+            self.stdout.write(name)
+            removed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено неиспользуемых изображений: {removed}'
+        ))
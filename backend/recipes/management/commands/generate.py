@@ -0,0 +1,161 @@
+import random
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import transaction
+from PIL import Image
+
+from api.cache import bump_version
+from recipes.loading import batched
+from recipes.models import (
+    FavoriteRecipe,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag
+)
+from recipes.search import update_search_index
+from users.models import Subscribe, User
+
+WORDS = (
+    'домашний', 'быстрый', 'летний', 'пряный', 'сливочный', 'запеченный',
+    'острый', 'нежный', 'бабушкин', 'постный', 'суп', 'салат', 'пирог',
+    'рагу', 'омлет', 'паста', 'каша', 'соус', 'десерт', 'плов'
+)
+
+
+class Command(BaseCommand):
+    help = 'Генерация тестовых данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes-per-author', type=int, default=10)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument(
+            '--subscriptions', type=int, default=10,
+            help='Подписок на пользователя'
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=20,
+            help='Избранных рецептов на пользователя'
+        )
+        parser.add_argument(
+            '--carts', type=int, default=5,
+            help='Рецептов в корзине на пользователя'
+        )
+        parser.add_argument('--password', default='benchmark-password')
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def bulk_create(self, model, objs, **kwargs):
+        for batch in batched(objs, self.batch_size):
+            model.objects.bulk_create(batch, **kwargs)
+
+    def sample(self, population, count):
+        return self.random.sample(population, min(count, len(population)))
+
+    def create_users(self, count, password, prefix):
+        password = make_password(password)
+        self.bulk_create(User, (
+            User(
+                email=f'{prefix}{number}@example.com',
+                username=f'{prefix}{number}',
+                first_name=self.random.choice(WORDS).capitalize(),
+                last_name=self.random.choice(WORDS).capitalize(),
+                password=password
+            ) for number in range(count)
+        ), ignore_conflicts=True)
+        return list(User.objects.filter(
+            username__startswith=prefix
+        ).values_list('id', flat=True))
+
+    def create_image(self):
+        buffer = BytesIO()
+        Image.new('RGB', (640, 480), (226, 108, 45)).save(buffer, 'JPEG')
+        field = Recipe._meta.get_field('image')
+        return field.storage.save(
+            field.generate_filename(None, 'generated.jpg'),
+            ContentFile(buffer.getvalue())
+        )
+
+    def create_recipes(self, users, per_author, per_recipe):
+        ingredients = list(Ingredient.objects.values_list('id', flat=True))
+        tags = list(Tag.objects.values_list('id', flat=True))
+        if not ingredients or not tags:
+            raise CommandError(
+                'Сначала загрузите ингредиенты и теги командой load.'
+            )
+        existing = set(Recipe.objects.filter(
+            author_id__in=users
+        ).values_list('author_id', flat=True))
+        authors = [user for user in users if user not in existing]
+        image = self.create_image()
+        self.bulk_create(Recipe, (
+            Recipe(
+                author_id=author,
+                image=image,
+                name=' '.join(self.random.sample(WORDS, 3)).capitalize(),
+                text=' '.join(self.random.choices(WORDS, k=40)),
+                cooking_time=self.random.randint(5, 180)
+            ) for author in authors for _ in range(per_author)
+        ))
+        recipes = list(Recipe.objects.filter(
+            author_id__in=authors
+        ).values_list('id', flat=True))
+        self.bulk_create(RecipeIngredient, (
+            RecipeIngredient(
+                recipe_id=recipe,
+                ingredient_id=ingredient,
+                amount=self.random.randint(1, 500)
+            ) for recipe in recipes
+            for ingredient in self.sample(ingredients, per_recipe)
+        ))
+        self.bulk_create(Recipe.tags.through, (
+            Recipe.tags.through(recipe_id=recipe, tag_id=tag)
+            for recipe in recipes
+            for tag in self.sample(tags, self.random.randint(1, len(tags)))
+        ))
+        return recipes
+
+    def create_relations(self, users, recipes, options):
+        self.bulk_create(Subscribe, (
+            Subscribe(user_id=user, author_id=author)
+            for user in users
+            for author in self.sample(users, options['subscriptions'] + 1)
+            if author != user
+        ), ignore_conflicts=True)
+        for model, count in (
+            (FavoriteRecipe, options['favorites']),
+            (ShoppingCart, options['carts'])
+        ):
+            self.bulk_create(model, (
+                model(user_id=user, recipe_id=recipe)
+                for user in users
+                for recipe in self.sample(recipes, count)
+            ), ignore_conflicts=True)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            users = self.create_users(
+                options['users'], options['password'], options['prefix']
+            )
+            recipes = self.create_recipes(
+                users,
+                options['recipes_per_author'],
+                options['ingredients_per_recipe']
+            )
+            self.create_relations(users, recipes, options)
+        call_command('recount', stdout=self.stdout)
+        call_command('process_images', stdout=self.stdout)
+        update_search_index(recipes)
+        bump_version('recipes', 'users')
+        self.stdout.write(self.style.SUCCESS(
+            f'Сгенерировано: пользователей {len(users)}, '
+            f'рецептов {len(recipes)}.'
+        ))
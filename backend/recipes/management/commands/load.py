@@ -1,27 +1,49 @@
-import json
-
 from django.conf import settings
 from django.core.management import BaseCommand
 
-from recipes.models import Ingredient, Tag
+from api.cache import bump_version
+from recipes.loading import LOADERS, read_rows
 
 
 class Command(BaseCommand):
     help = 'Загрузка данных'
 
-    def handle(self, *args, **kwargs):
-        data_path = settings.BASE_DIR
-        with open(
-            f'{data_path}/data/ingredients.json',
-            'r',
-            encoding='utf-8'
-        ) as file:
-            reader = json.load(file)
-            Ingredient.objects.bulk_create(
-                Ingredient(**data) for data in reader)
-        data = [
-            {'name': 'Завтрак', 'color': '#E26C2D', 'slug': 'breakfast'},
-            {'name': 'Обед', 'color': '#49B64E', 'slug': 'dinner'},
-            {'name': 'Ужин', 'color': '#8775D2', 'slug': 'supper'}]
-        Tag.objects.bulk_create(Tag(**tag) for tag in data)
+    def add_arguments(self, parser):
+        for entity in LOADERS:
+            parser.add_argument(
+                f'--{entity}', metavar='PATH',
+                help='Файл .json, .ndjson или .csv'
+            )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число потоков, параллельно записывающих пакеты'
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Обновлять существующие записи вместо пропуска'
+        )
+
+    def handle(self, *args, **options):
+        paths = {
+            entity: options[entity] for entity in LOADERS
+            if options[entity]
+        }
+        if not paths:
+            paths = {
+                'ingredients': settings.BASE_DIR / 'data' / 'ingredients.json',
+                'tags': settings.BASE_DIR / 'data' / 'tags.json',
+            }
+        for entity, path in paths.items():
+            loader = LOADERS[entity](
+                batch_size=options['batch_size'], update=options['update']
+            )
+            total, elapsed = loader.load(
+                read_rows(path), workers=options['workers']
+            )
+            self.stdout.write(
+                f'{entity}: {total} строк за {elapsed:.2f} с '
+                f'({total / max(elapsed, 1e-6):.0f} строк/с)'
+            )
+        bump_version('recipes', 'tags', 'ingredients', 'users')
         self.stdout.write(self.style.SUCCESS('Данные загружены!'))
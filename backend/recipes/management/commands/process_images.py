@@ -0,0 +1,50 @@
+from django.core.management import BaseCommand
+
+from api.cache import bump_version
+from recipes.images import logger, render_variants
+from recipes.loading import batched
+from recipes.models import Recipe
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Создание уменьшенных копий изображений рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии для всех рецептов'
+        )
+
+    def collect(self, reprocess):
+        images = {}
+        for recipe in Recipe.objects.only('image', 'thumbnails').iterator():
+            if not recipe.image or (recipe.thumbnails and not reprocess):
+                continue
+            image, ids = images.setdefault(recipe.image.name, (
+                recipe.image, []
+            ))
+            ids.append(recipe.pk)
+        return images.values()
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        for image, ids in self.collect(options['all']):
+            try:
+                thumbnails = render_variants(image)
+            except Exception:
+                logger.exception(
+                    'Не удалось обработать изображение %s', image.name
+                )
+                failed += len(ids)
+                continue
+            for batch in batched(ids, BATCH_SIZE):
+                processed += Recipe.objects.filter(
+                    pk__in=batch, image=image.name
+                ).update(thumbnails=thumbnails)
+        if processed:
+            bump_version('recipes')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано рецептов: {processed}, с ошибками: {failed}.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from recipes.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчет счетчиков рецептов и пользователей'
+
+    def handle(self, *args, **kwargs):
+        recipes, users = recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счетчики пересчитаны: рецептов {recipes}, '
+            f'пользователей {users}.'
+        ))
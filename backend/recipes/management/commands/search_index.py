@@ -0,0 +1,12 @@
+from django.core.management import BaseCommand
+
+from recipes.search import setup_search_index, update_search_index
+
+
+class Command(BaseCommand):
+    help = 'Перестроение поискового индекса рецептов'
+
+    def handle(self, *args, **kwargs):
+        setup_search_index()
+        update_search_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен!'))
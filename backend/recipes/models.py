@@ -2,6 +2,8 @@ from colorfield.fields import ColorField
 from django.core.validators import (MinValueValidator,
                                     RegexValidator)
 from django.db import models
+from django.db.models import Exists, OuterRef, Prefetch, Value
+from recipes.storage import ContentAddressedStorage
 from users.models import User
 
 
@@ -61,6 +63,38 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False, output_field=models.BooleanField()),
+                is_in_shopping_cart=Value(
+                    False, output_field=models.BooleanField()
+                )
+            )
+        return self.annotate(
+            is_favorited=Exists(FavoriteRecipe.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            ))
+        )
+
+    def for_feed(self, user):
+        return self.with_user_flags(user).prefetch_related(
+            Prefetch(
+                'author', queryset=User.objects.with_subscription(user)
+            ),
+            'tags',
+            Prefetch(
+                'recipe',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -75,9 +109,15 @@ class Recipe(models.Model):
     image = models.ImageField(
         verbose_name='Изображение',
         upload_to='static/recipe/',
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True
     )
+    thumbnails = models.JSONField(
+        verbose_name='Обработанные изображения',
+        default=dict,
+        editable=False
+    )
     text = models.TextField(
         verbose_name='Описание рецепта'
     )
@@ -99,11 +139,29 @@ class Recipe(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='В избранном',
+        default=0,
+        editable=False
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        verbose_name='В корзинах',
+        default=0,
+        editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_id_idx'
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,120 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'recipes_recipe_fts'
+
+INGREDIENT_NAMES = (
+    'SELECT {} FROM recipes_recipeingredient ri '
+    'JOIN recipes_ingredient i ON i.id = ri.ingredient_id '
+    'WHERE ri.recipe_id = r.id'
+)
+
+POSTGRESQL = {
+    'setup': (
+        'ALTER TABLE recipes_recipe '
+        'ADD COLUMN IF NOT EXISTS search_vector tsvector',
+        'CREATE INDEX IF NOT EXISTS recipes_recipe_search_gin '
+        'ON recipes_recipe USING GIN (search_vector)',
+    ),
+    'update': (
+        f"UPDATE recipes_recipe r SET search_vector = "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', r.name), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', r.text), 'B') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(("
+        + INGREDIENT_NAMES.format("string_agg(i.name, ' ')") +
+        "), '')), 'C') WHERE {where}",
+    ),
+    'match': (
+        f'SELECT id FROM recipes_recipe WHERE search_vector '
+        f"@@ plainto_tsquery('{SEARCH_CONFIG}', %s)"
+    ),
+    'rank': (
+        f'ts_rank(recipes_recipe.search_vector, '
+        f"plainto_tsquery('{SEARCH_CONFIG}', %s))"
+    ),
+}
+
+SQLITE = {
+    'setup': (
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+        f'USING fts5(name, text, ingredients)',
+    ),
+    'update': (
+        f'DELETE FROM {FTS_TABLE} WHERE {{where_rowid}}',
+        f'INSERT INTO {FTS_TABLE} (rowid, name, text, ingredients) '
+        f'SELECT r.id, r.name, r.text, coalesce(('
+        + INGREDIENT_NAMES.format("group_concat(i.name, ' ')") +
+        "), '') FROM recipes_recipe r WHERE {where}",
+    ),
+    'match': f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+    'rank': (
+        f'(SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 1.0) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = recipes_recipe.id)'
+    ),
+}
+
+
+def get_statements(db=connection):
+    return {
+        'postgresql': POSTGRESQL,
+        'sqlite': SQLITE,
+    }.get(db.vendor)
+
+
+def get_query(query):
+    if connection.vendor != 'sqlite':
+        return query
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""'))
+        for word in re.findall(r'\w+', query)
+    ) or '""'
+
+
+def setup_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    statements = get_statements(connections[using])
+    if statements is None:
+        return
+    with connections[using].cursor() as cursor:
+        for sql in statements['setup']:
+            cursor.execute(sql)
+
+
+def update_search_index(recipe_ids=None):
+    statements = get_statements()
+    if statements is None:
+        return
+    if recipe_ids is None:
+        where = where_rowid = '1 = 1'
+        params = []
+    else:
+        params = list(recipe_ids)
+        if not params:
+            return
+        placeholders = ', '.join(['%s'] * len(params))
+        where = f'r.id IN ({placeholders})'
+        where_rowid = f'rowid IN ({placeholders})'
+    with connection.cursor() as cursor:
+        for sql in statements['update']:
+            cursor.execute(
+                sql.format(where=where, where_rowid=where_rowid), params
+            )
+
+
+def search_filter(query):
+    statements = get_statements()
+    if statements is None:
+        return Q(name__icontains=query)
+    return Q(pk__in=RawSQL(statements['match'], (get_query(query),)))
+
+
+def search_rank(query):
+    statements = get_statements()
+    if statements is None:
+        return RawSQL('0', (), output_field=FloatField())
+    return RawSQL(
+        statements['rank'], (get_query(query),), output_field=FloatField()
+    )
@@ -0,0 +1,146 @@
+import base64
+from io import BytesIO
+
+import pytest
+from django.core.cache import cache
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import token_cache
+from recipes.models import (FavoriteRecipe, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart, Tag)
+from users.models import Subscribe, User
+
+
+@pytest.fixture(autouse=True)
+def isolated(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.RECIPE_IMAGE_WORKERS = 0
+    cache.clear()
+    token_cache.delete(*list(token_cache.entries))
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_user(db):
+    counter = iter(range(1, 10 ** 6))
+
+    def make_user(**kwargs):
+        number = next(counter)
+        user = User(
+            email=f'user{number}@example.com',
+            username=f'user{number}',
+            first_name='Имя',
+            last_name='Фамилия',
+            **kwargs
+        )
+        user.set_password('password')
+        user.save()
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def token_client(user):
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(name=name, color=color, slug=slug)
+        for name, color, slug in (
+            ('Завтрак', '#E26C2D', 'breakfast'),
+            ('Обед', '#49B64E', 'lunch'),
+            ('Ужин', '#8775D2', 'dinner'),
+        )
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'ингредиент {number:03}', measurement_unit='г')
+        for number in range(100)
+    )
+    return list(Ingredient.objects.order_by('name'))
+
+
+@pytest.fixture
+def make_recipes(tags, ingredients):
+
+    def make_recipes(author, count, per_recipe=3):
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=author,
+                name=f'Рецепт {number}',
+                text='Описание',
+                image='static/recipe/recipe.png',
+                cooking_time=10
+            ) for number in range(count)
+        )
+        recipes = list(Recipe.objects.filter(author=author))
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=5)
+            for recipe in recipes
+            for ingredient in ingredients[:per_recipe]
+        )
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag.pk)
+            for recipe in recipes
+            for tag in tags[:2]
+        )
+        User.objects.filter(pk=author.pk).update(recipes_count=count)
+        return recipes
+
+    return make_recipes
+
+
+@pytest.fixture
+def subscribe():
+
+    def subscribe(user, authors):
+        Subscribe.objects.bulk_create(
+            Subscribe(user=user, author=author) for author in authors
+        )
+
+    return subscribe
+
+
+@pytest.fixture
+def mark_recipes():
+
+    def mark_recipes(user, recipes):
+        for model in (FavoriteRecipe, ShoppingCart):
+            model.objects.bulk_create(
+                model(user=user, recipe=recipe) for recipe in recipes
+            )
+
+    return mark_recipes
+
+
+@pytest.fixture
+def image():
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), (226, 108, 45)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
@@ -0,0 +1,14 @@
+import os
+
+os.environ.setdefault('SECRET_KEY', 'tests')
+os.environ.setdefault('DB_ENGINE', 'django.db.backends.sqlite3')
+os.environ.setdefault('DB_NAME', 'db.sqlite3')
+os.environ.setdefault('QUERY_PROFILING', '1')
+os.environ.setdefault('QUERY_BUDGET_STRICT', '1')
+
+from foodgram.settings import *  # noqa: E402,F401,F403
+
+DATABASES['replica1'] = {  # noqa: F405
+    **DATABASES['default'],  # noqa: F405
+    'NAME': 'replica.sqlite3',
+}
@@ -0,0 +1,48 @@
+import pytest
+from django.test import Client
+
+from recipes.models import Recipe
+from recipes.search import search_filter
+
+
+def search(query):
+    return list(Recipe.objects.filter(search_filter(query)))
+
+
+@pytest.fixture
+def admin_client(make_user):
+    client = Client()
+    client.force_login(make_user(is_staff=True, is_superuser=True))
+    return client
+
+
+@pytest.mark.django_db
+def test_admin_changes_update_search_index(admin_client, user, tags,
+                                           make_recipes):
+    recipe, = make_recipes(user, 1)
+    ingredient = recipe.ingredients.first()
+    response = admin_client.post(
+        f'/admin/recipes/recipe/{recipe.pk}/change/', {
+            'author': user.pk,
+            'name': 'Борщ',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'tags': [tag.pk for tag in tags[:2]],
+            'recipe-TOTAL_FORMS': 0,
+            'recipe-INITIAL_FORMS': 0,
+        }
+    )
+    assert response.status_code == 302
+    assert search('борщ') == [recipe]
+    response = admin_client.post(
+        f'/admin/recipes/ingredient/{ingredient.pk}/change/', {
+            'name': 'свекла',
+            'measurement_unit': ingredient.measurement_unit,
+        }
+    )
+    assert response.status_code == 302
+    assert search('свекла') == [recipe]
+    admin_client.post(
+        f'/admin/recipes/recipe/{recipe.pk}/delete/', {'post': 'yes'}
+    )
+    assert search('борщ') == []
@@ -0,0 +1,123 @@
+import pytest
+from django.contrib.auth.hashers import make_password
+
+LOGIN = '/api/auth/token/login/'
+ME = '/api/users/me/'
+
+
+def test_login_inside_transaction(user, client):
+    response = client.post(
+        LOGIN, {'email': user.email, 'password': 'password'},
+        content_type='application/json'
+    )
+    assert response.status_code == 201
+    assert response.json()['auth_token']
+
+
+def test_login_rejects_wrong_password_and_unknown_email(user, client):
+    for email, password in (
+        (user.email, 'wrong-password'),
+        ('missing@example.com', 'password'),
+    ):
+        response = client.post(
+            LOGIN, {'email': email, 'password': password},
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+
+
+def test_login_upgrades_outdated_hash(settings, user, client):
+    settings.PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+    user.password = make_password('password', hasher='md5')
+    user.save()
+    response = client.post(
+        LOGIN, {'email': user.email, 'password': 'password'},
+        content_type='application/json'
+    )
+    assert response.status_code == 201
+    user.refresh_from_db()
+    assert user.password.startswith('pbkdf2_sha256$')
+
+
+def test_set_password(user, user_client):
+    response = user_client.post('/api/users/set_password/', {
+        'current_password': 'password',
+        'new_password': 'new-Password-123'
+    }, format='json')
+    assert response.status_code == 201
+    user.refresh_from_db()
+    assert user.check_password('new-Password-123')
+
+
+def login_attempts(client, emails, forwarded_for=None):
+    return [
+        client.post(
+            LOGIN.rstrip('/'),
+            {'email': email, 'password': 'wrong-password'},
+            content_type='application/json',
+            **({'HTTP_X_FORWARDED_FOR': forwarded_for(number)}
+               if forwarded_for else {})
+        ).status_code
+        for number, email in enumerate(emails)
+    ]
+
+
+def test_login_without_slash_is_throttled(settings, user, client):
+    settings.PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher'
+    ]
+    assert login_attempts(client, [user.email] * 6) == [400] * 5 + [429]
+
+
+def test_forwarded_for_prefix_does_not_reset_ip_throttle(db, settings, client):
+    settings.PASSWORD_HASHING_RATE = 0
+    settings.PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher'
+    ]
+    statuses = login_attempts(
+        client,
+        [f'user{number}@example.com' for number in range(31)],
+        lambda number: f'10.0.0.{number}, 192.0.2.1'
+    )
+    assert statuses == [400] * 30 + [429]
+
+
+def test_hashing_rate_is_limited(settings, monkeypatch, user, client):
+    settings.PASSWORD_HASHING_RATE = 2
+    monkeypatch.setattr('api.passwords.time.time', lambda: 1000.0)
+    statuses = [
+        client.post(
+            LOGIN, {'email': user.email, 'password': 'wrong-password'},
+            content_type='application/json'
+        ).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [400, 400, 503]
+
+
+@pytest.mark.parametrize('shared_cache', [False, True])
+def test_token_is_rejected_after_logout(
+    settings, token_client, django_capture_on_commit_callbacks, shared_cache
+):
+    settings.AUTH_TOKEN_SHARED_CACHE = shared_cache
+    assert token_client.get(ME).status_code == 200
+    with django_capture_on_commit_callbacks(execute=True):
+        response = token_client.post('/api/auth/token/logout/')
+    assert response.status_code == 204
+    assert token_client.get(ME).status_code == 401
+
+
+@pytest.mark.parametrize('shared_cache', [False, True])
+def test_token_is_rejected_for_inactive_user(
+    settings, user, token_client, django_capture_on_commit_callbacks,
+    shared_cache
+):
+    settings.AUTH_TOKEN_SHARED_CACHE = shared_cache
+    assert token_client.get(ME).status_code == 200
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+    assert token_client.get(ME).status_code == 401
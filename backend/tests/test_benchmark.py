@@ -0,0 +1,48 @@
+import json
+import os
+from io import StringIO
+
+from django.core.management import call_command
+
+SCALES = (
+    {'users': 10, 'recipes_per_author': 3, 'subscriptions': 5,
+     'favorites': 5, 'carts': 3},
+    {'users': 40, 'recipes_per_author': 6, 'subscriptions': 20,
+     'favorites': 20, 'carts': 5},
+)
+
+
+def run_benchmark(path, prefix, scale):
+    call_command(
+        'generate', prefix=prefix, ingredients_per_recipe=5,
+        stdout=StringIO(), **scale
+    )
+    call_command(
+        'benchmark', user=f'{prefix}0@example.com',
+        iterations=int(os.getenv('BENCHMARK_ITERATIONS', default=5)),
+        warmup=1, output=str(path), stdout=StringIO()
+    )
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def test_api_benchmark(tags, ingredients, tmp_path):
+    output = os.getenv('BENCHMARK_OUTPUT')
+    runs = [
+        run_benchmark(
+            tmp_path / f'scale{number}.json', f'scale{number}-', scale
+        )
+        for number, scale in enumerate(SCALES)
+    ]
+    if output:
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(runs, file, ensure_ascii=False, indent=2)
+    small, large = (run['results'] for run in runs)
+    assert small.keys() == large.keys()
+    for name, result in large.items():
+        assert all(
+            int(code) < 400 for code in result['statuses']
+        ), (name, result['statuses'])
+        assert result['queries']['max'] <= small[name]['queries']['max'], (
+            name, small[name]['queries'], result['queries']
+        )
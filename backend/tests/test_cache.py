@@ -0,0 +1,57 @@
+import pytest
+
+INGREDIENTS = '/api/ingredients/?name=ингредиент 00'
+
+
+@pytest.mark.parametrize('authenticated', [False, True])
+def test_ingredient_search_sends_validators(
+    client, token_client, ingredients, authenticated
+):
+    client = token_client if authenticated else client
+    first = client.get(INGREDIENTS)
+    second = client.get(INGREDIENTS)
+    assert first.status_code == second.status_code == 200
+    assert len(first.json()) == 10
+    assert first['ETag'] == second['ETag']
+    response = client.get(INGREDIENTS, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 304
+
+
+def test_anonymous_cache_is_invalidated_when_tags_change(
+    client, user, tags, make_recipes, django_assert_num_queries,
+    django_capture_on_commit_callbacks
+):
+    make_recipes(user, 1)
+    for url in ('/api/tags/', '/api/recipes/'):
+        assert client.get(url).status_code == 200
+        with django_assert_num_queries(0):
+            assert client.get(url).status_code == 200
+    tag = tags[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        tag.name = 'Переименованный'
+        tag.save()
+    assert tag.name in {item['name'] for item in client.get(
+        '/api/tags/'
+    ).json()}
+    recipe, = client.get('/api/recipes/').json()['results']
+    assert tag.name in {item['name'] for item in recipe['tags']}
+
+
+def test_matching_etag_returns_not_modified_until_data_changes(
+    token_client, user, make_user, make_recipes,
+    django_capture_on_commit_callbacks
+):
+    recipe, = make_recipes(make_user(), 1)
+    url = f'/api/recipes/{recipe.pk}/'
+    etag = token_client.get(url)['ETag']
+    response = token_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    with django_capture_on_commit_callbacks(execute=True):
+        assert token_client.post(
+            f'/api/recipes/{recipe.pk}/favorite/'
+        ).status_code == 201
+    response = token_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.json()['is_favorited']
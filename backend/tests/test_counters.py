@@ -0,0 +1,38 @@
+from recipes.models import FavoriteRecipe, Recipe, ShoppingCart
+from users.models import Subscribe, User
+
+
+def test_counters_follow_api_admin_and_cascades(
+    user, user_client, make_user, make_recipes
+):
+    author = make_user()
+    recipes = make_recipes(author, 2)
+    for recipe in recipes:
+        for action in ('favorite', 'shopping_cart'):
+            response = user_client.post(
+                f'/api/recipes/{recipe.pk}/{action}/'
+            )
+            assert response.status_code == 201
+    response = user_client.post(f'/api/users/{author.pk}/subscribe/')
+    assert response.status_code == 201
+    author.refresh_from_db()
+    assert (author.recipes_count, author.followers_count) == (2, 1)
+    assert set(Recipe.objects.values_list(
+        'favorites_count', 'shopping_cart_count'
+    )) == {(1, 1)}
+
+    recipes[0].delete()
+    author.refresh_from_db()
+    assert author.recipes_count == 1
+    response = user_client.get('/api/users/subscriptions/')
+    assert response.json()['results'][0]['recipes_count'] == 1
+
+    user.delete()
+    author.refresh_from_db()
+    recipe = Recipe.objects.get()
+    assert author.followers_count == 0
+    assert (recipe.favorites_count, recipe.shopping_cart_count) == (0, 0)
+    assert not FavoriteRecipe.objects.exists()
+    assert not ShoppingCart.objects.exists()
+    assert not Subscribe.objects.exists()
+    assert User.objects.get(pk=author.pk).recipes_count == 1
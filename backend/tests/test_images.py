@@ -0,0 +1,200 @@
+import base64
+import json
+import os
+import struct
+import subprocess
+import sys
+import zlib
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image, PngImagePlugin
+from rest_framework.exceptions import ValidationError
+
+from api.fields import Base64ImageField
+from recipes.images import ORIENTATION, process_in_worker
+from recipes.models import Recipe
+
+MEASURE_RSS = '''
+import json
+import sys
+
+import django
+
+django.setup()
+
+from api.fields import Base64ImageField
+
+
+def read_status(name):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(name + ':'):
+                return int(line.split()[1])
+
+
+field = Base64ImageField()
+field.to_internal_value(sys.argv[2]).close()
+with open(sys.argv[1]) as file:
+    data = file.read()
+with open('/proc/self/clear_refs', 'w') as clear_refs:
+    clear_refs.write('5')
+before = read_status('VmRSS')
+field.to_internal_value(data).close()
+print(json.dumps({'before_kb': before, 'after_kb': read_status('VmHWM')}))
+'''
+
+
+def make_chunk(kind, data):
+    return (
+        struct.pack('>I', len(data)) + kind + data
+        + struct.pack('>I', zlib.crc32(kind + data))
+    )
+
+
+def encode(content, mime='image/png'):
+    return f'data:{mime};base64,' + base64.b64encode(content).decode()
+
+
+def make_noise_jpeg(width, height):
+    buffer = BytesIO()
+    noise = os.urandom(width * height * 3)
+    Image.frombytes('RGB', (width, height), noise).save(
+        buffer, 'JPEG', quality=95
+    )
+    return buffer.getvalue()
+
+
+def test_decompression_bomb_is_rejected():
+    png = b'\x89PNG\r\n\x1a\n' + make_chunk(
+        b'IHDR', struct.pack('>IIBBBBB', 20000, 20000, 8, 2, 0, 0, 0)
+    ) + make_chunk(b'IDAT', zlib.compress(b'')) + make_chunk(b'IEND', b'')
+    with pytest.raises(ValidationError) as error:
+        Base64ImageField().to_internal_value(encode(png))
+    assert error.value.detail[0].code == 'too_many_pixels'
+
+
+def test_oversized_image_is_rejected_from_header(settings, image):
+    settings.RECIPE_IMAGE_MAX_SIDE = 32
+    with pytest.raises(ValidationError) as error:
+        Base64ImageField().to_internal_value(image)
+    assert error.value.detail[0].code == 'too_many_pixels'
+
+
+@pytest.mark.skipif(
+    not os.path.exists('/proc/self/clear_refs'),
+    reason='Пиковый RSS измеряется через /proc'
+)
+@pytest.mark.parametrize('width, height', [(1000, 750), (3000, 2000)])
+def test_upload_peak_rss(tmp_path, image, width, height):
+    content = make_noise_jpeg(width, height)
+    payload = tmp_path / 'payload.txt'
+    payload.write_text(encode(content, 'image/jpeg'))
+    result = subprocess.run(
+        [sys.executable, '-c', MEASURE_RSS, str(payload), image],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'tests.settings'},
+        cwd=os.path.dirname(os.path.dirname(__file__))
+    )
+    rss = json.loads(result.stdout)
+    growth = (rss['after_kb'] - rss['before_kb']) * 1024
+    print(
+        f'\nupload {len(content) / 2 ** 20:.1f} MiB: '
+        f'peak RSS growth {growth / 2 ** 20:.1f} MiB'
+    )
+    assert growth < max(len(content) // 2, 4 * 2 ** 20)
+
+
+def make_image_with_metadata(image_format):
+    image = Image.new('RGB', (40, 20), 'red')
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6
+    exif[0x010F] = 'Camera'
+    buffer = BytesIO()
+    if image_format == 'PNG':
+        info = PngImagePlugin.PngInfo()
+        info.add_text('Comment', 'secret')
+        image.save(buffer, image_format, pnginfo=info, exif=exif)
+    else:
+        image.save(buffer, image_format, exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('image_format, mime, orientation', [
+    ('JPEG', 'image/jpeg', 6),
+    ('PNG', 'image/png', None),
+    ('WEBP', 'image/webp', None),
+])
+def test_upload_metadata_is_stripped(image_format, mime, orientation):
+    content = make_image_with_metadata(image_format)
+    file = Base64ImageField().to_internal_value(encode(content, mime))
+    stripped = file.read()
+    file.close()
+    assert file.size == len(stripped) < len(content)
+    assert b'Camera' not in stripped and b'secret' not in stripped
+    image = Image.open(BytesIO(stripped))
+    image.load()
+    assert image.size == (40, 20)
+    assert dict(image.getexif()) == (
+        {ORIENTATION: orientation} if orientation else {}
+    )
+    assert 'Comment' not in image.info
+
+
+def test_unsupported_format_is_rejected():
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, 'BMP')
+    with pytest.raises(ValidationError) as error:
+        Base64ImageField().to_internal_value(
+            encode(buffer.getvalue(), 'image/bmp')
+        )
+    assert error.value.detail[0].code == 'invalid_format'
+
+
+@pytest.mark.django_db
+def test_processing_failure_is_logged(user, make_recipes, caplog):
+    recipe, = make_recipes(user, 1)
+    process_in_worker(recipe.pk)
+    recipe.refresh_from_db()
+    assert recipe.thumbnails == {}
+    assert 'Не удалось обработать' in caplog.text
+
+
+@pytest.mark.django_db
+def test_process_images_fills_missing_thumbnails(
+    settings, user, make_recipes
+):
+    recipes = make_recipes(user, 3)
+    name = default_storage.save(
+        'static/recipe/source.png',
+        ContentFile(make_image_with_metadata('PNG'))
+    )
+    Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes]).update(
+        image=name
+    )
+    call_command('process_images', stdout=StringIO())
+    thumbnails = set(
+        json.dumps(recipe.thumbnails, sort_keys=True)
+        for recipe in Recipe.objects.all()
+    )
+    assert len(thumbnails) == 1
+    assert set(json.loads(thumbnails.pop())) == set(
+        settings.RECIPE_IMAGE_SIZES
+    )
+
+
+@pytest.mark.django_db
+def test_collect_images_keeps_reuploaded_file():
+    storage = Recipe._meta.get_field('image').storage
+    content = make_image_with_metadata('PNG')
+    name = storage.save('static/recipe/old.png', ContentFile(content))
+    orphan = storage.save('static/recipe/orphan.png', ContentFile(b'x'))
+    for path in (name, orphan):
+        os.utime(storage.path(path), (0, 0))
+    assert storage.save('static/recipe/new.png', ContentFile(content)) == name
+    call_command('collect_images', stdout=StringIO())
+    assert storage.exists(name)
+    assert not storage.exists(orphan)
@@ -0,0 +1,22 @@
+import threading
+
+from recipes.loading import RecipeLoader
+
+
+def test_duplicate_recipes_are_not_loaded_concurrently(db, monkeypatch):
+    rows = [
+        {'author': f'author{number % 3}@example.com', 'name': 'Борщ'}
+        for number in range(12)
+    ]
+    batches = []
+    lock = threading.Lock()
+
+    def load_batch(self, batch):
+        with lock:
+            batches.append(batch)
+        return len(batch)
+
+    monkeypatch.setattr(RecipeLoader, 'load_batch', load_batch)
+    total, _ = RecipeLoader(batch_size=1).load(iter(rows), workers=4)
+    keys = [(row['author'], row['name']) for batch in batches for row in batch]
+    assert total == len(keys) == len(set(keys)) == 3
@@ -0,0 +1,21 @@
+import pytest
+
+from api.middleware import QueryBudgetExceeded
+
+
+def test_server_timing_reports_serializer(user, user_client, make_recipes):
+    make_recipes(user, 3)
+    response = user_client.get('/api/recipes/')
+    assert response.status_code == 200
+    timings = dict(
+        entry.split(';')[0:2]
+        for entry in response['Server-Timing'].split(', ')
+    )
+    assert set(timings) == {'db', 'app', 'serializer', 'render', 'total'}
+    assert float(timings['serializer'][len('dur='):]) > 0
+
+
+def test_query_budget_is_enforced(settings, client, tags):
+    settings.QUERY_BUDGETS = {**settings.QUERY_BUDGETS, 'tags-list': 0}
+    with pytest.raises(QueryBudgetExceeded):
+        client.get('/api/tags/')
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from recipes.models import Recipe
+
+RECIPES_LIST_QUERIES = 6
+RECIPE_CREATE_QUERIES = 16
+
+
+@pytest.mark.parametrize('limit', [1, 6, 50])
+def test_recipes_list_queries_do_not_depend_on_page_size(
+    user, user_client, make_user, make_recipes, mark_recipes,
+    django_assert_num_queries, limit
+):
+    author = make_user()
+    recipes = make_recipes(author, 60)
+    mark_recipes(user, recipes[::2])
+    with django_assert_num_queries(RECIPES_LIST_QUERIES):
+        response = user_client.get(f'/api/recipes/?limit={limit}')
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == limit
+    assert {recipe['is_favorited'] for recipe in results} == (
+        {True, False} if limit > 1 else {results[0]['is_favorited']}
+    )
+
+
+@pytest.mark.parametrize('count', [1, 30, 100])
+def test_recipe_create_queries_do_not_depend_on_ingredient_count(
+    user, user_client, tags, ingredients, image,
+    django_assert_num_queries, count
+):
+    data = {
+        'name': 'Рецепт',
+        'text': 'Описание',
+        'cooking_time': 10,
+        'image': image,
+        'tags': [tag.pk for tag in tags],
+        'ingredients': [
+            {'id': ingredient.pk, 'amount': 10}
+            for ingredient in ingredients[:count]
+        ]
+    }
+    with django_assert_num_queries(RECIPE_CREATE_QUERIES):
+        response = user_client.post('/api/recipes/', data, format='json')
+    assert response.status_code == 201, response.json()
+    assert len(response.json()['ingredients']) == count
+    assert Recipe.objects.get().recipe.count() == count
+
+
+def test_recipe_create_reports_all_missing_ingredients(
+    user_client, tags, ingredients, image
+):
+    response = user_client.post('/api/recipes/', {
+        'name': 'Рецепт',
+        'text': 'Описание',
+        'cooking_time': 10,
+        'image': image,
+        'tags': [tags[0].pk],
+        'ingredients': [
+            {'id': ingredients[0].pk, 'amount': 10},
+            {'id': 100001, 'amount': 10},
+            {'id': 100002, 'amount': 10},
+        ]
+    }, format='json')
+    assert response.status_code == 400
+    assert '100001' in str(response.json())
+    assert '100002' in str(response.json())
+    assert not Recipe.objects.exists()
+
+
+def test_cursor_walks_every_recipe_once(user, user_client, make_recipes):
+    recipes = make_recipes(user, 25)
+    same_time = timezone.now() - timedelta(days=1)
+    Recipe.objects.filter(
+        pk__in=[recipe.pk for recipe in recipes[5:15]]
+    ).update(pub_date=same_time)
+    expected = list(
+        Recipe.objects.order_by('-pub_date', '-id').values_list(
+            'id', flat=True
+        )
+    )
+    seen, url = [], '/api/recipes/?limit=4&cursor='
+    while url:
+        response = user_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data['results']) <= 4
+        seen.extend(recipe['id'] for recipe in data['results'])
+        url = data['next']
+    assert seen == expected
+
+
+def test_invalid_cursor_is_not_found(user_client):
+    response = user_client.get('/api/recipes/?cursor=not-a-cursor')
+    assert response.status_code == 404
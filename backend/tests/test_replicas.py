@@ -0,0 +1,47 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Tag
+
+TAGS = '/api/tags/'
+
+
+@pytest.fixture
+def replica(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ['replica1']
+    settings.DB_REPLICA_STICKY_SECONDS = 60
+    now = time.time() + settings.DB_REPLICA_STICKY_SECONDS * 2
+    monkeypatch.setattr('api.db.time', SimpleNamespace(time=lambda: now))
+    Tag.objects.using('replica1').bulk_create([
+        Tag(name='Только на реплике', color='#000000', slug='replica')
+    ])
+
+
+def tag_slugs(client, **headers):
+    response = client.get(TAGS, **headers)
+    assert response.status_code == 200
+    return {tag['slug'] for tag in response.json()}
+
+
+@pytest.mark.django_db(databases=['default', 'replica1'])
+def test_reads_use_replica_after_sticky_window(replica, tags):
+    assert tag_slugs(Client()) == {'replica'}
+
+
+@pytest.mark.django_db(databases=['default', 'replica1'])
+def test_reads_stay_on_primary_after_write(
+    replica, user, make_user, make_recipes
+):
+    token, _ = Token.objects.get_or_create(user=user)
+    client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+    assert tag_slugs(client) == {'replica'}
+    recipe, = make_recipes(make_user(), 1)
+    response = client.post(f'/api/recipes/{recipe.pk}/favorite/')
+    assert response.status_code == 201
+    assert tag_slugs(client) == set(
+        Tag.objects.using('default').values_list('slug', flat=True)
+    )
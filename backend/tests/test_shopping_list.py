@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+import pytest
+from django.http import FileResponse
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.async_views import async_read_view
+from api.exporters import EXPORTERS
+from recipes.models import ShoppingCart
+
+CART = '/api/recipes/{}/shopping_cart/'
+DOWNLOAD = '/api/recipes/download_shopping_cart/?format=txt'
+
+
+def download(client):
+    response = client.get(DOWNLOAD)
+    assert response.status_code == 200
+    return b''.join(response.streaming_content).decode()
+
+
+def test_delete_removes_duplicate_cart_rows_from_cached_list(
+    user, user_client, make_user, make_recipes,
+    django_capture_on_commit_callbacks
+):
+    recipe, = make_recipes(make_user(), 1, per_recipe=1)
+    ingredient = recipe.ingredients.get()
+    with django_capture_on_commit_callbacks(execute=True):
+        ShoppingCart.objects.create(user=user, recipe=recipe)
+        ShoppingCart.objects.create(user=user, recipe=recipe)
+    assert '10' in download(user_client)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.delete(CART.format(recipe.pk))
+    assert response.status_code == 204
+    assert not ShoppingCart.objects.filter(user=user).exists()
+    assert ingredient.name not in download(user_client)
+
+
+def test_recipe_update_refreshes_cached_lists(
+    user, user_client, make_recipes, ingredients,
+    django_capture_on_commit_callbacks
+):
+    recipe, = make_recipes(user, 1, per_recipe=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(CART.format(recipe.pk))
+    assert ingredients[0].name in download(user_client)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.patch(f'/api/recipes/{recipe.pk}/', {
+            'ingredients': [{'id': ingredients[1].pk, 'amount': 7}],
+            'tags': [tag.pk for tag in recipe.tags.all()]
+        }, format='json')
+    assert response.status_code == 200, response.json()
+    content = download(user_client)
+    assert ingredients[0].name not in content
+    assert ingredients[1].name in content
+
+
+def test_async_download_is_rendered_off_the_event_loop(
+    monkeypatch, user, user_client, make_user, make_recipes, mark_recipes
+):
+    mark_recipes(user, make_recipes(make_user(), 2))
+    download(user_client)
+    export, content_type = EXPORTERS['pdf']
+    threads = []
+
+    def recorded_export(items):
+        threads.append(threading.current_thread().name)
+        yield from export(items)
+
+    monkeypatch.setitem(EXPORTERS, 'pdf', (recorded_export, content_type))
+    request = APIRequestFactory().get(DOWNLOAD.replace('txt', 'pdf'))
+    force_authenticate(request, user)
+    view = async_read_view(resolve(DOWNLOAD.split('?')[0]).func)
+    response = asyncio.run(view(request))
+    assert threads and threads[0].startswith('api-read')
+    assert isinstance(response, FileResponse)
+    assert response['Content-Type'] == 'application/pdf'
+    assert 'attachment' in response['Content-Disposition']
+    content = b''.join(response.streaming_content)
+    assert content.startswith(b'%PDF')
+    assert int(response['Content-Length']) == len(content)
+
+
+@pytest.mark.parametrize('export_format', ['txt', 'csv', 'pdf'])
+def test_download_errors_are_rendered_as_json(client, export_format):
+    response = client.get(DOWNLOAD.replace('txt', export_format))
+    assert response.status_code == 401
+    assert response['Content-Type'] == 'application/json'
+    assert response.json()['detail']
@@ -0,0 +1,34 @@
+import pytest
+
+from users.models import User
+
+SUBSCRIPTIONS_QUERIES = 3
+
+
+@pytest.mark.parametrize('authors', [10, 1000])
+def test_subscriptions_queries_do_not_depend_on_author_count(
+    user, user_client, make_user, make_recipes, subscribe,
+    django_assert_num_queries, authors
+):
+    author = make_user()
+    make_recipes(author, 5)
+    User.objects.bulk_create(
+        User(email=f'author{number}@example.com', username=f'author{number}')
+        for number in range(authors - 1)
+    )
+    subscribe(user, User.objects.exclude(pk__in=[user.pk, author.pk]))
+    subscribe(user, [author])
+    with django_assert_num_queries(SUBSCRIPTIONS_QUERIES):
+        response = user_client.get(
+            '/api/users/subscriptions/?limit=10&recipes_limit=3'
+        )
+    assert response.status_code == 200
+    data = response.json()
+    assert data['count'] == authors
+    assert len(data['results']) == 10
+    found = next(
+        result for result in data['results'] if result['id'] == author.pk
+    )
+    assert found['is_subscribed']
+    assert found['recipes_count'] == 5
+    assert len(found['recipes']) == 3
@@ -10,7 +10,9 @@ class UserAdmin(admin.ModelAdmin):
         'username',
         'email',
         'first_name',
-        'last_name'
+        'last_name',
+        'recipes_count',
+        'followers_count'
     )
     list_filter = (
         'email',
@@ -26,6 +28,7 @@ class SubscribeAdmin(admin.ModelAdmin):
         'user',
         'author'
     )
+    list_select_related = ('user', 'author')
     search_fields = (
         'user',
         'author'
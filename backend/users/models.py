@@ -1,6 +1,43 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
-from django.db.models import UniqueConstraint
+from django.db.models import (Exists, OuterRef, Prefetch, Subquery,
+                              UniqueConstraint, Value)
+
+
+class UserQuerySet(models.QuerySet):
+
+    def with_subscription(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                is_subscribed=Value(
+                    False, output_field=models.BooleanField()
+                )
+            )
+        return self.annotate(
+            is_subscribed=Exists(Subscribe.objects.filter(
+                user=user, author=OuterRef('pk')
+            ))
+        )
+
+    def with_recipes(self, recipes_limit=None):
+        from recipes.models import Recipe
+
+        recipes = Recipe.objects.all()
+        if recipes_limit and str(recipes_limit).isdigit():
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:int(recipes_limit)]
+            ))
+        return self.prefetch_related(
+            Prefetch(
+                'recipe_user', queryset=recipes, to_attr='limited_recipes'
+            )
+        )
+
+
+class CustomUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
 
 
 class User(AbstractUser):
@@ -17,10 +54,22 @@ class User(AbstractUser):
         verbose_name='Фамилия',
         max_length=100
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Количество рецептов',
+        default=0,
+        editable=False
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Количество подписчиков',
+        default=0,
+        editable=False
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    objects = CustomUserManager()
+
     class Meta:
         ordering = ['id']
         verbose_name = 'Пользователь'